@@ -1,102 +1,214 @@
-from manim import *
-
-__all__ = ["NumberGrid"]
+import copy
+from collections import OrderedDict
+from functools import cached_property
+
+import numpy as np
+
+__all__ = ["NumberGrid", "NumberGridCache", "number_grid_cache"]
+
+# Building a NumberGrid means a NumberPlane with numbers, whose labels are Tex
+# mobjects, plus the border and ticks, and scenes build the same grids over
+# and over. Built grids are kept as templates keyed on their parameters and
+# the frame config, and each NumberGrid gets a deep copy of one.
+#
+# The plane is built up front with its numbers on it, as grid always carried
+# them. The border and ticks are built on first access, so a scene that only
+# adds grid never pays for them; group builds everything.
+#
+# manim itself is only imported once a grid is built, by the functions that
+# build one. Reading one of its names off this module, as in
+# `number_grid.Scene`, imports it and returns manim's.
+
+def load_manim():
+    import manim
+    return manim
+
+def __getattr__(name):
+    # the star import never brings in underscore names, so probes for those,
+    # like hasattr(module, '_repr_html_'), don't import manim; without manim
+    # the name is simply missing
+    if not name.startswith('_'):
+        try:
+            manim = load_manim()
+        except ImportError:
+            manim = None
+        if manim is not None and hasattr(manim, name):
+            return getattr(manim, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+# 0.3 * UP + 0.3 * RIGHT
+OFFSET = np.array((0.3, 0.3, 0.))
+
+def fit_frame_height():
+    from manim import config
+
+    aspect = config.pixel_width / config.pixel_height
+    config.frame_height = config.frame_width / aspect
+
+def build_plane(xmin, xmax, xstep, ymin, ymax, ystep, include_tips=False):
+    from manim import ORIGIN, NumberPlane, config
+
+    return NumberPlane(
+        x_range=[xmin, xmax, xstep],
+        y_range=[ymin, ymax, ystep],
+        x_length=config.frame_width  - 2,
+        y_length=config.frame_height - 2,
+        x_axis_config={
+            "include_numbers": True,
+            "numbers_to_exclude": (),
+            "numbers_to_include": np.arange(xmin, xmax + 1, xstep),
+            "label_direction": ORIGIN,
+            "font_size": 36,
+            "stroke_width": 3,
+            "include_tip": include_tips,
+        },
+        y_axis_config={
+            "include_numbers": True,
+            "numbers_to_exclude": (),
+            "numbers_to_include": np.arange(ymin, ymax + 1, ystep),
+            "label_direction": ORIGIN,
+            "font_size": 36,
+            "stroke_width": 3,
+            "include_tip": include_tips,
+        },
+    )
+
+def place_numbers(grid, vpad=0.4, hpad=0.2):
+    # numbers below the bottom border and left of the left one
+    from manim import DOWN, LEFT
+
+    left_x = grid.get_edge_center(LEFT)[0]
+    bottom_y = grid.get_edge_center(DOWN)[1]
+
+    x_nums = grid.x_axis.numbers
+    y_nums = grid.y_axis.numbers
+
+    x_nums.set_y(bottom_y - vpad)
+    y_nums.set_x(left_x- hpad)
+    return x_nums, y_nums
+
+def tick_marks(starts, direction, tick_length=0.15, tick_stroke=2):
+    # every tick is one straight cubic segment of a single VMobject; the
+    # segments don't touch, so each one is its own subpath
+    from manim import VMobject
+
+    starts = np.asarray(starts, dtype=float)
+    d = tick_length * np.asarray(direction, dtype=float)
+    points = np.stack((starts, starts + d / 3, starts + 2 * d / 3, starts + d), axis=1).reshape(-1, 3)
+    ticks = VMobject(stroke_width=tick_stroke)
+    ticks.set_points(points)
+    return ticks
+
+class NumberGridCache():
+    # Least recently used templates are dropped past maxsize. get() always
+    # hands out a fresh copy, so scenes can move and restyle their grid freely.
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.templates = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, xmin, xmax, xstep, ymin, ymax, ystep, include_tips=False):
+        from manim import config
+
+        return (xmin, xmax, xstep, ymin, ymax, ystep, bool(include_tips),
+                config.pixel_width, config.pixel_height, config.frame_width, config.frame_height)
+
+    def template(self, *params, **options):
+        fit_frame_height()
+        key = self.key(*params, **options)
+        grid = self.templates.get(key)
+        if grid is None:
+            self.misses += 1
+            grid = NumberGrid(*params, cache=None, **options)
+            self.templates[key] = grid
+            while len(self.templates) > self.maxsize:
+                self.templates.popitem(last=False)
+        else:
+            self.hits += 1
+            self.templates.move_to_end(key)
+        return grid
+
+    def get(self, *params, **options):
+        # one deepcopy of the whole grid, so the copy's parts still share
+        # submobjects the way the template's do (x_nums lives inside grid too)
+        return copy.deepcopy(self.template(*params, **options))
+
+    def prewarm(self, *grids):
+        # each entry is the parameter tuple of a grid; building the template
+        # renders every number label once and group builds the remaining
+        # parts, so later grids only pay for a copy
+        for params in grids:
+            self.template(*params).group
+
+    def clear(self):
+        self.templates.clear()
+
+number_grid_cache = NumberGridCache()
 
 class NumberGrid():
-    def __init__(self, xmin, xmax, xstep, ymin, ymax, ystep, include_tips=False):
-            aspect = config.pixel_width / config.pixel_height
-            config.frame_height = config.frame_width / aspect
-            
-            grid = NumberPlane(
-                x_range=[xmin, xmax, xstep],
-                y_range=[ymin, ymax, ystep],
-                x_length=config.frame_width  - 2,
-                y_length=config.frame_height - 2,
-                x_axis_config={
-                    "include_numbers": True,
-                    "numbers_to_exclude": (),
-                    "numbers_to_include": np.arange(xmin, xmax + 1, xstep),
-                    "label_direction": ORIGIN,
-                    "font_size": 36,
-                    "stroke_width": 3,
-                    "include_tip": include_tips,
-                },
-                y_axis_config={
-                    "include_numbers": True,
-                    "numbers_to_exclude": (),
-                    "numbers_to_include": np.arange(ymin, ymax + 1, ystep),
-                    "label_direction": ORIGIN,
-                    "font_size": 36,
-                    "stroke_width": 3,
-                    "include_tip": include_tips,
-                },
-            )
-
-            # corners of the grid in scene coordinates
-            lower_left = grid.c2p(xmin, ymin)
-            upper_right = grid.c2p(xmax, ymax)
-
-            # center + size from those corners
-            center = (lower_left + upper_right) / 2
-            width = abs(upper_right[0] - lower_left[0])
-            height = abs(upper_right[1] - lower_left[1])
-
-            edge = Rectangle(
-                width=width,
-                height=height,
-                stroke_color=WHITE,
-                stroke_width=2,
-            ).move_to(center)
-
-            left_x = grid.get_edge_center(LEFT)[0]
-            bottom_y = grid.get_edge_center(DOWN)[1]
-
-            vpad = 0.4
-            hpad = 0.2
-
-            x_nums = grid.x_axis.numbers
-            y_nums = grid.y_axis.numbers
-
-            x_nums.set_y(bottom_y - vpad)
-            y_nums.set_x(left_x- hpad)
-
-            def create_ticks(bottom_ticks, left_ticks):
-                tick_length = 0.15
-                tick_stroke = 2
-
-                # x-axis ticks placed along the bottom border
-                for v in np.arange(xmin, xmax + 1, xstep):
-                    pt = grid.c2p(v, ymin)
-                    tick = Line(
-                        pt,
-                        pt + tick_length * DOWN,
-                        stroke_width=tick_stroke
-                    )
-                    bottom_ticks.add(tick)
-
-                # y-axis ticks placed along the left border
-                for v in np.arange(ymin, ymax + 1, ystep):
-                    pt = grid.c2p(xmin, v)
-                    tick = Line(
-                        pt,
-                        pt + tick_length * LEFT,
-                        stroke_width=tick_stroke
-                    )
-                    left_ticks.add(tick)
-
-            bottom_ticks = VGroup()
-            left_ticks   = VGroup()
-            create_ticks(bottom_ticks, left_ticks)
-
-            offset = 0.3
-
-            group = VGroup(grid, edge, bottom_ticks, left_ticks, x_nums, y_nums)
-            group.shift(offset * UP + offset * RIGHT)
-
-            self.group = group
-            self.grid = grid
-            self.edge = edge
-            self.bottom_ticks = bottom_ticks
-            self.left_ticks = left_ticks
-            self.x_nums = x_nums
-            self.y_nums = y_nums
\ No newline at end of file
+    def __init__(self, xmin, xmax, xstep, ymin, ymax, ystep, include_tips=False, cache=number_grid_cache):
+        if cache is not None:
+            self.__dict__.update(cache.get(xmin, xmax, xstep, ymin, ymax, ystep, include_tips=include_tips).__dict__)
+            return
+
+        fit_frame_height()
+        self.x_values = np.arange(xmin, xmax + 1, xstep)
+        self.y_values = np.arange(ymin, ymax + 1, ystep)
+        self.xmin, self.ymin = xmin, ymin
+        self.xmax, self.ymax = xmax, ymax
+
+        self.grid = build_plane(xmin, xmax, xstep, ymin, ymax, ystep, include_tips=include_tips)
+        self.x_nums, self.y_nums = place_numbers(self.grid)
+        self.grid.shift(OFFSET)
+
+    def to_points(self, xs, ys):
+        # grid.c2p for whole arrays; the plane is linear, so its map is fixed
+        # by where it sends one corner and the two unit steps from it
+        origin = self.grid.c2p(self.xmin, self.ymin)
+        ex = self.grid.c2p(self.xmin + 1, self.ymin) - origin
+        ey = self.grid.c2p(self.xmin, self.ymin + 1) - origin
+        xs = np.asarray(xs, dtype=float) - self.xmin
+        ys = np.asarray(ys, dtype=float) - self.ymin
+        return origin + xs[:, None] * ex + ys[:, None] * ey
+
+    @cached_property
+    def edge(self):
+        from manim import WHITE, Rectangle
+
+        # corners of the grid in scene coordinates
+        lower_left = self.grid.c2p(self.xmin, self.ymin)
+        upper_right = self.grid.c2p(self.xmax, self.ymax)
+
+        # center + size from those corners
+        center = (lower_left + upper_right) / 2
+        width = abs(upper_right[0] - lower_left[0])
+        height = abs(upper_right[1] - lower_left[1])
+
+        return Rectangle(
+            width=width,
+            height=height,
+            stroke_color=WHITE,
+            stroke_width=2,
+        ).move_to(center)
+
+    @cached_property
+    def bottom_ticks(self):
+        # x-axis ticks placed along the bottom border
+        from manim import DOWN
+
+        return tick_marks(self.to_points(self.x_values, np.full(len(self.x_values), self.ymin)), DOWN)
+
+    @cached_property
+    def left_ticks(self):
+        # y-axis ticks placed along the left border
+        from manim import LEFT
+
+        return tick_marks(self.to_points(np.full(len(self.y_values), self.xmin), self.y_values), LEFT)
+
+    @cached_property
+    def group(self):
+        from manim import VGroup
+
+        return VGroup(self.grid, self.edge, self.bottom_ticks, self.left_ticks, self.x_nums, self.y_nums)
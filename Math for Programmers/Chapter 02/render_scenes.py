@@ -0,0 +1,245 @@
+import argparse
+import hashlib
+import json
+import os
+import shlex
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+import types
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.util import Finalize
+from pathlib import Path
+
+__all__ = ["find_scenes", "load_scene_module", "render_scenes", "summary"]
+
+# Renders every manim Scene in a module or notebook across a process pool.
+#
+# Tex labels go through one shared directory of compiled SVGs named by a hash
+# of the tex source and template, so a label is compiled once for the whole
+# batch no matter which worker meets it first. A worker compiles in its own
+# scratch directory while holding a lock file for that hash, then moves the SVG
+# into place with os.replace, so other workers either find the finished file
+# or wait for it and never read a half-written one.
+#
+#   python render_scenes.py chapter_02.ipynb
+#   python render_scenes.py ../../tests/manim_test.ipynb Test1 Updaters -p 4
+
+DEFAULT_TEX_DIR = os.path.join('media', 'Tex', 'shared')
+
+QUALITY_FLAGS = {'-ql': 'low_quality', '-qm': 'medium_quality', '-qh': 'high_quality',
+                 '-qp': 'production_quality', '-qk': 'fourk_quality'}
+
+def magic_options(line):
+    # the few %%manim flags that change the output, as config overrides
+    args = shlex.split(line)[1:]
+    options = {}
+    for i, arg in enumerate(args):
+        if arg in QUALITY_FLAGS:
+            options['quality'] = QUALITY_FLAGS[arg]
+        elif arg in ('-r', '--resolution') and i + 1 < len(args):
+            width, height = args[i + 1].split(',')
+            options['pixel_width'], options['pixel_height'] = int(width), int(height)
+        elif arg in ('-s', '--save_last_frame'):
+            options['save_last_frame'] = True
+    return quality_first(options)
+
+def quality_first(options):
+    # ManimConfig.update applies keys in order and setting quality resets the
+    # resolution, so quality goes first and an explicit resolution wins, as it
+    # does on the manim CLI
+    return dict(sorted(options.items(), key=lambda item: item[0] != 'quality'))
+
+def notebook_source(path):
+    # code cells with their IPython magics dropped, plus the %%manim options
+    # of each cell keyed by the scene it renders
+    with open(path) as f:
+        cells = json.load(f)['cells']
+    chunks, options = [], {}
+    for cell in cells:
+        if cell['cell_type'] != 'code':
+            continue
+        lines = ''.join(cell['source']).splitlines()
+        if lines and lines[0].startswith('%%manim'):
+            # the scene name is the last argument of the magic
+            name = shlex.split(lines[0])[-1]
+            if name.isidentifier():
+                options[name] = magic_options(lines[0])
+        chunks.append('\n'.join(line for line in lines if not line.lstrip().startswith(('%', '!'))))
+    return '\n\n'.join(chunks), options
+
+def load_scene_module(path):
+    # a .py file or a notebook, imported with its own directory on sys.path so
+    # imports like `from number_grid import *` resolve
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    name = os.path.splitext(os.path.basename(path))[0]
+    module = types.ModuleType(name)
+    module.__file__ = path
+    if path.endswith('.ipynb'):
+        source, module.scene_options = notebook_source(path)
+    else:
+        with open(path) as f:
+            source, module.scene_options = f.read(), {}
+    exec(compile(source, path, 'exec'), module.__dict__)
+    return module
+
+def find_scenes(module):
+    from manim import Scene
+    return [name for name, obj in vars(module).items()
+            if isinstance(obj, type) and issubclass(obj, Scene) and obj.__module__ == module.__name__]
+
+# shared tex cache, installed once per worker
+
+tex_counts = {'compiled': 0, 'shared': 0}
+
+def tex_key(expression, environment, tex_template):
+    h = hashlib.sha256()
+    for part in (expression, environment, getattr(tex_template, 'body', repr(tex_template))):
+        h.update(repr(part).encode())
+        h.update(b'\0')
+    return h.hexdigest()[:24]
+
+def acquire(lock, stale_seconds):
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(lock) > stale_seconds:
+                # a worker died holding it
+                os.remove(lock)
+        except FileNotFoundError:
+            pass
+        return False
+
+def shared_tex(compile_svg, shared_dir, stale_seconds=600, poll=0.05):
+    from manim import config
+
+    def tex_to_svg_file(expression, environment=None, tex_template=None):
+        tex_template = tex_template or config.tex_template
+        target = os.path.join(shared_dir, tex_key(expression, environment, tex_template) + '.svg')
+        lock = target + '.lock'
+        while not os.path.exists(target):
+            if not acquire(lock, stale_seconds):
+                time.sleep(poll)
+                continue
+            try:
+                if not os.path.exists(target):
+                    svg = compile_svg(expression, environment=environment, tex_template=tex_template)
+                    partial = '{}.{}.part'.format(target, os.getpid())
+                    shutil.copyfile(svg, partial)
+                    os.replace(partial, target)
+                    tex_counts['compiled'] += 1
+                    return Path(target)
+            finally:
+                os.remove(lock)
+        tex_counts['shared'] += 1
+        return Path(target)
+
+    return tex_to_svg_file
+
+def init_worker(tex_dir):
+    # compile into a private scratch directory, publish through tex_dir
+    import manim
+    import manim.mobject.text.tex_mobject as tex_mobject
+    import manim.utils.tex_file_writing as tex_file_writing
+
+    os.makedirs(tex_dir, exist_ok=True)
+    manim.config.tex_dir = scratch = tempfile.mkdtemp(prefix='tex-')
+    # removed when the worker exits; atexit handlers don't run in forked pool
+    # workers, multiprocessing finalizers do
+    Finalize(None, shutil.rmtree, args=(scratch, True), exitpriority=0)
+    patched = shared_tex(tex_file_writing.tex_to_svg_file, tex_dir)
+    tex_file_writing.tex_to_svg_file = patched
+    tex_mobject.tex_to_svg_file = patched
+
+loaded_modules = {}
+
+def render_scene(path, name, options):
+    from manim import tempconfig
+
+    start = time.perf_counter()
+    before = dict(tex_counts)
+    output, error = None, None
+    try:
+        if path not in loaded_modules:
+            loaded_modules[path] = load_scene_module(path)
+        module = loaded_modules[path]
+        overrides = quality_first(dict(getattr(module, 'scene_options', {}).get(name, {}), **options))
+        with tempconfig(dict({'preview': False, 'disable_caching': True}, **overrides)):
+            scene = getattr(module, name)()
+            scene.render()
+            writer = scene.renderer.file_writer
+            for attr in ('movie_file_path', 'image_file_path'):
+                candidate = getattr(writer, attr, None)
+                if candidate and os.path.exists(candidate):
+                    output = str(candidate)
+                    break
+    except Exception:
+        error = traceback.format_exc()
+    tex = {k: tex_counts[k] - before[k] for k in tex_counts}
+    return {'scene': name, 'seconds': time.perf_counter() - start, 'output': output,
+            'error': error, 'tex_compiled': tex['compiled'], 'tex_shared': tex['shared'], 'pid': os.getpid()}
+
+def render_scenes(path, names=None, processes=None, tex_dir=DEFAULT_TEX_DIR, **options):
+    # yields one result dict per scene as they finish; options are manim
+    # config overrides applied to every scene, on top of its %%manim flags
+    if names is None:
+        names = find_scenes(load_scene_module(path))
+    processes = processes or min(len(names), os.cpu_count() or 1) or 1
+    path, tex_dir = os.path.abspath(path), os.path.abspath(tex_dir)
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker, initargs=(tex_dir,)) as pool:
+        pending = {pool.submit(render_scene, path, name, options): name for name in names}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception:
+                    yield {'scene': name, 'seconds': 0.0, 'output': None, 'error': traceback.format_exc(),
+                           'tex_compiled': 0, 'tex_shared': 0, 'pid': None}
+
+def summary(results, wall_seconds=None):
+    results = sorted(results, key=lambda r: r['scene'])
+    lines = ['{:<28} {:>8} {:>9} {:>7}  {}'.format('scene', 'status', 'seconds', 'tex', 'output')]
+    for r in results:
+        lines.append('{:<28} {:>8} {:>9.2f} {:>3}/{:<3}  {}'.format(
+            r['scene'], 'ok' if r['error'] is None else 'FAILED', r['seconds'],
+            r['tex_compiled'], r['tex_shared'], r['output'] or ''))
+    failed = [r for r in results if r['error'] is not None]
+    total = sum(r['seconds'] for r in results)
+    lines.append('{} scenes, {} failed, {:.2f}s of rendering{}; tex compiled/shared {}/{}'.format(
+        len(results), len(failed), total,
+        '' if wall_seconds is None else ' in {:.2f}s wall'.format(wall_seconds),
+        sum(r['tex_compiled'] for r in results), sum(r['tex_shared'] for r in results)))
+    for r in failed:
+        lines.append('')
+        lines.append('--- {} ---'.format(r['scene']))
+        lines.append(r['error'].rstrip())
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the manim scenes of a module or notebook in parallel.")
+    parser.add_argument('path', help=".py module or .ipynb notebook")
+    parser.add_argument('scenes', nargs='*', help="scene names, all scenes when omitted")
+    parser.add_argument('-p', '--processes', type=int)
+    parser.add_argument('--tex-dir', default=DEFAULT_TEX_DIR, help="shared compiled-Tex directory")
+    parser.add_argument('-q', '--quality', choices=sorted(set(QUALITY_FLAGS.values())))
+    args = parser.parse_args(argv)
+
+    options = {'quality': args.quality} if args.quality else {}
+    start = time.perf_counter()
+    results = list(render_scenes(args.path, args.scenes or None, processes=args.processes,
+                                 tex_dir=args.tex_dir, **options))
+    print(summary(results, time.perf_counter() - start))
+    return 1 if any(r['error'] is not None for r in results) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
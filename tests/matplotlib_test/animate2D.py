@@ -0,0 +1,52 @@
+import os
+from itertools import chain
+
+import matplotlib.pyplot as plt
+from matplotlib.animation import FFMpegWriter, FuncAnimation, PillowWriter
+
+from draw2D import build2D, fit_limits_2D, set_ticks_2D, transform_objects_2D
+from figure_pool import default_pool, style_name
+
+__all__ = ["animate2D"]
+
+# Animates a sequence of frames, each a list of draw2D objects. The axes,
+# ticks and style are built once from the first frame; every later frame only
+# pushes new offsets, segments and arrow outlines into the existing artists.
+
+def animate2D(frames, fixed_limits=True, blit=True, interval=50, fps=20, save_as=None, frame_dir=None, dark_mode=True, pool=default_pool, **options):
+    frames = iter(frames)
+    first = tuple(next(frames))
+    frames = chain([first], frames)
+    grid_size = options.get('grid_size', (1,1))
+    ticks = options.get('ticks', True)
+    transform = options.get('transform')
+
+    def update(scene, objects):
+        if transform is not None:
+            objects = tuple(transform_objects_2D(transform, objects))
+        if not fixed_limits:
+            fit_limits_2D(scene.ax, objects, grid_size)
+            if ticks:
+                set_ticks_2D(scene.ax, grid_size)
+        return scene.update(objects)
+
+    if save_as is None and frame_dir is None:
+        plt.style.use(style_name(dark_mode))
+        fig = plt.figure()
+        scene = build2D(fig, *first, dark_mode=dark_mode, **options)
+        return FuncAnimation(fig, lambda objects: update(scene, objects), frames=frames,
+                             interval=interval, blit=blit and fixed_limits, cache_frame_data=False)
+
+    with pool.figure(dark_mode) as fig:
+        scene = build2D(fig, *first, dark_mode=dark_mode, **options)
+        if frame_dir is not None:
+            os.makedirs(frame_dir, exist_ok=True)
+            for i, objects in enumerate(frames):
+                update(scene, objects)
+                fig.savefig(os.path.join(frame_dir, 'frame_{:05d}.png'.format(i)), dpi=fig.dpi)
+        else:
+            writer = PillowWriter(fps=fps) if save_as.endswith('.gif') else FFMpegWriter(fps=fps)
+            with writer.saving(fig, save_as, fig.dpi):
+                for objects in frames:
+                    update(scene, objects)
+                    writer.grab_frame()
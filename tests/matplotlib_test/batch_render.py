@@ -0,0 +1,84 @@
+import importlib
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+__all__ = ["Scene", "SceneResult", "render_batch"]
+
+# Renders many scenes across a pool of worker processes. Each worker imports
+# the drawing modules once and renders through its own figure pool, so figures
+# are reused across every scene that worker handles. Results are yielded as
+# scenes finish, and an exception in one scene is reported in its result
+# rather than raised.
+
+class Scene():
+    def __init__(self, *objects, kind='2D', save_as=None, format=None, **options):
+        self.objects = objects
+        self.kind = kind
+        self.save_as = save_as
+        self.format = format or (os.path.splitext(save_as)[1][1:] if save_as else 'png')
+        self.options = options
+
+class SceneResult():
+    def __init__(self, index, scene, data=None, error=None, seconds=0.0):
+        self.index = index
+        self.save_as = scene.save_as
+        self.data = data
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+# what the drawing functions import on their first call
+WARM_MODULES = ('draw2D', 'draw3D', 'projected3D', 'matplotlib.figure', 'matplotlib.backends.backend_agg',
+                'matplotlib.collections', 'matplotlib.textpath', 'matplotlib.ticker', 'mpl_toolkits.mplot3d.art3d')
+
+def warm_worker():
+    # importing the drawing modules no longer imports matplotlib, so load it
+    # here rather than in the first scene
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+
+def render_scene(scene):
+    from draw2D import render2D
+    from draw3D import render3D
+
+    start = time.perf_counter()
+    try:
+        render = render2D if scene.kind == '2D' else render3D
+        data = render(*scene.objects, format=scene.format, **scene.options)
+        if scene.save_as:
+            with open(scene.save_as, 'wb') as f:
+                f.write(data)
+            data = None
+        return data, None, time.perf_counter() - start
+    except Exception:
+        return None, traceback.format_exc(), time.perf_counter() - start
+
+def render_batch(scenes, processes=None, max_pending=None):
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or 2 * processes
+    scenes = enumerate(scenes)
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=warm_worker) as pool:
+        pending = {}
+
+        def submit(n):
+            for index, scene in islice(scenes, n):
+                pending[pool.submit(render_scene, scene)] = (index, scene)
+
+        submit(max_pending)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, scene = pending.pop(future)
+                try:
+                    data, error, seconds = future.result()
+                except Exception:
+                    data, error, seconds = None, traceback.format_exc(), 0.0
+                yield SceneResult(index, scene, data=data, error=error, seconds=seconds)
+            submit(max_pending - len(pending))
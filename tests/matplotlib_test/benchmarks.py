@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import vector_math
+import vector_math_np
+
+__all__ = ["benchmark", "run_benchmarks", "save_results", "load_results", "compare", "check_imports"]
+
+# Timing suite for the vector math and drawing helpers. Each benchmark is a
+# setup function taking a size and returning the callable to time, so data
+# generation stays out of the measurement. Results are written as JSON and can
+# be checked against an earlier run:
+#
+#   python benchmarks.py --output baseline.json
+#   python benchmarks.py --baseline baseline.json --threshold 0.2
+#
+# which exits with status 1 when any benchmark got slower than the threshold,
+# or when importing one of the modules in LAZY_IMPORTS pulled in the heavy
+# modules it is meant to load only on first use.
+
+BENCHMARKS = {}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+NUMBER_GRID_DIR = os.path.join(HERE, '..', '..', 'Math for Programmers', 'Chapter 02')
+
+# module -> modules that importing it must not import
+LAZY_IMPORTS = {
+    'vector_math': ('numpy', 'matplotlib'),
+    'draw2D': ('matplotlib', 'mpl_toolkits.mplot3d'),
+    'draw3D': ('matplotlib', 'mpl_toolkits.mplot3d'),
+    'render_cache': ('matplotlib', 'mpl_toolkits.mplot3d'),
+    'batch_render': ('matplotlib', 'mpl_toolkits.mplot3d'),
+    'number_grid': ('manim',),
+}
+
+def benchmark(name, sizes):
+    def register(setup):
+        BENCHMARKS[name] = (setup, tuple(sizes))
+        return setup
+    return register
+
+def random_vectors(n, dim=2, seed=0):
+    return np.random.default_rng(seed).uniform(-10, 10, size=(n, dim))
+
+# vector_math, one call per vector, against vector_math_np on whole arrays
+
+@benchmark('vector_math.add', sizes=(1000, 100000))
+def bench_add(n):
+    vs = [tuple(v) for v in random_vectors(n).tolist()]
+    return lambda: [vector_math.add(v, w) for v, w in zip(vs, vs[1:])]
+
+@benchmark('vector_math_np.add', sizes=(1000, 100000, 1000000))
+def bench_add_np(n):
+    vs = random_vectors(n)
+    return lambda: vector_math_np.add(vs[:-1], vs[1:])
+
+@benchmark('vector_math.length', sizes=(1000, 100000))
+def bench_length(n):
+    vs = [tuple(v) for v in random_vectors(n).tolist()]
+    return lambda: [vector_math.length(v) for v in vs]
+
+@benchmark('vector_math_np.length', sizes=(1000, 100000, 1000000))
+def bench_length_np(n):
+    vs = random_vectors(n)
+    return lambda: vector_math_np.length(vs)
+
+@benchmark('vector_math.dot', sizes=(1000, 100000))
+def bench_dot(n):
+    vs = [tuple(v) for v in random_vectors(n, 3).tolist()]
+    return lambda: [vector_math.dot(v, w) for v, w in zip(vs, vs[1:])]
+
+@benchmark('vector_math_np.dot', sizes=(1000, 100000, 1000000))
+def bench_dot_np(n):
+    vs = random_vectors(n, 3)
+    return lambda: vector_math_np.dot(vs[:-1], vs[1:])
+
+@benchmark('vector_math.rotate', sizes=(1000, 100000))
+def bench_rotate(n):
+    vs = [tuple(v) for v in random_vectors(n).tolist()]
+    return lambda: vector_math.rotate(0.3, vs)
+
+@benchmark('vector_math_np.rotate', sizes=(1000, 100000, 1000000))
+def bench_rotate_np(n):
+    vs = random_vectors(n)
+    return lambda: vector_math_np.rotate(0.3, vs)
+
+@benchmark('vector_math.perimeter', sizes=(1000, 100000))
+def bench_perimeter(n):
+    vs = [tuple(v) for v in random_vectors(n).tolist()]
+    return lambda: vector_math.perimeter(vs)
+
+@benchmark('vector_math_np.perimeter', sizes=(1000, 100000, 1000000))
+def bench_perimeter_np(n):
+    vs = random_vectors(n)
+    return lambda: vector_math_np.perimeter(vs)
+
+# drawing, headless; each run returns its RenderStats so the report can split
+# build time from encoding time
+
+def render_with_stats(render, objects, **options):
+    from render_stats import RenderStats
+    def run():
+        stats = RenderStats()
+        render(*objects, stats=stats, **options)
+        return stats
+    return run
+
+@benchmark('draw2D.points', sizes=(10, 1000, 100000))
+def bench_draw2D_points(n):
+    from draw2D import Point2D, Points2D, render2D
+    vs = random_vectors(n)
+    objects = [Points2D(vs, color='blue')] if n > 1000 else [Point2D(x, y, color='blue') for x, y in vs.tolist()]
+    return render_with_stats(render2D, objects)
+
+@benchmark('draw2D.arrows', sizes=(10, 100, 1000))
+def bench_draw2D_arrows(n):
+    from draw2D import Arrow2D, render2D
+    objects = [Arrow2D(tuple(v)) for v in random_vectors(n).tolist()]
+    return render_with_stats(render2D, objects)
+
+@benchmark('draw3D.points', sizes=(10, 1000, 100000))
+def bench_draw3D_points(n):
+    from draw3D import Point3D, Points3D, render3D
+    vs = random_vectors(n, 3)
+    objects = [Points3D(vs, color='blue')] if n > 1000 else [Point3D(x, y, z, color='blue') for x, y, z in vs.tolist()]
+    return render_with_stats(render3D, objects)
+
+@benchmark('draw3D.points_projected', sizes=(1000, 100000))
+def bench_draw3D_points_projected(n):
+    from draw3D import Points3D, render3D
+    return render_with_stats(render3D, [Points3D(random_vectors(n, 3), color='blue')], projected=True)
+
+@benchmark('draw3D.arrows', sizes=(10, 100, 1000))
+def bench_draw3D_arrows(n):
+    from draw3D import Arrow3D, render3D
+    objects = [Arrow3D(tuple(v)) for v in random_vectors(n, 3).tolist()]
+    return render_with_stats(render3D, objects)
+
+# NumberGrid needs manim; the benchmark is reported as skipped without it
+
+def import_number_grid():
+    if NUMBER_GRID_DIR not in sys.path:
+        sys.path.append(NUMBER_GRID_DIR)
+    # importing number_grid no longer needs manim, so load it here to have a
+    # missing manim skip the benchmark instead of failing inside the timing
+    import number_grid
+    number_grid.load_manim()
+    return number_grid.NumberGrid
+
+@benchmark('NumberGrid', sizes=(5, 10, 20))
+def bench_number_grid(n):
+    NumberGrid = import_number_grid()
+    return lambda: NumberGrid(-n, n, 1, -n, n, 1)
+
+@benchmark('NumberGrid.uncached', sizes=(5, 10, 20))
+def bench_number_grid_uncached(n):
+    NumberGrid = import_number_grid()
+    return lambda: NumberGrid(-n, n, 1, -n, n, 1, cache=None)
+
+# import time, each in a fresh interpreter as a short-lived worker would pay
+# it, interpreter startup included
+
+def run_import(module, code=''):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([HERE, NUMBER_GRID_DIR, os.environ.get('PYTHONPATH', '')]))
+    return subprocess.run([sys.executable, '-c', 'import {}\n{}'.format(module, code)],
+                          env=env, capture_output=True, text=True, check=True).stdout
+
+def register_import_benchmark(module):
+    @benchmark('import.' + module, sizes=(1,))
+    def bench_import(n):
+        return lambda: run_import(module)
+
+for module in LAZY_IMPORTS:
+    register_import_benchmark(module)
+
+def check_imports():
+    # module -> the heavy modules importing it loaded, for the modules that
+    # loaded any
+    loaded = {}
+    for module, heavy in LAZY_IMPORTS.items():
+        out = run_import(module, 'import sys\nprint(*[m for m in {!r} if m in sys.modules])'.format(heavy))
+        if out.split():
+            loaded[module] = out.split()
+    return loaded
+
+def time_call(run, repeat):
+    # one untimed call first so caches and lazy imports don't land in the numbers
+    run()
+    times, stages = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = run()
+        times.append(time.perf_counter() - start)
+        if hasattr(out, 'stages') and times[-1] == min(times):
+            stages = dict(out.stages)
+    result = {'best': min(times), 'median': statistics.median(times), 'repeat': repeat}
+    if stages is not None:
+        result['stages'] = stages
+    return result
+
+def run_benchmarks(only=None, quick=False, repeat=5, report=None):
+    # only is a list of name substrings; quick runs just the smallest size
+    results = {}
+    for name, (setup, sizes) in BENCHMARKS.items():
+        if only and not any(part in name for part in only):
+            continue
+        results[name] = {}
+        for size in sizes[:1] if quick else sizes:
+            try:
+                run = setup(size)
+            except ImportError as e:
+                results[name] = {'skipped': str(e)}
+                break
+            results[name][str(size)] = time_call(run, repeat)
+            if report is not None:
+                report(name, size, results[name][str(size)])
+    return results
+
+def environment():
+    import matplotlib
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+def save_results(results, path):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2, sort_keys=True)
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+def compare(results, baseline, threshold=0.2, min_seconds=0.001):
+    # best times that grew by more than threshold (0.2 = 20%); differences
+    # under min_seconds are timer noise and never count
+    regressions = []
+    for name, sizes in results.items():
+        for size, current in sizes.items():
+            before = baseline.get(name, {}).get(size)
+            if not isinstance(current, dict) or not isinstance(before, dict):
+                continue
+            ratio = current['best'] / before['best'] if before['best'] else float('inf')
+            if ratio > 1 + threshold and current['best'] - before['best'] > min_seconds:
+                regressions.append((name, int(size), before['best'], current['best'], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time vector_math, draw2D, draw3D and NumberGrid.")
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write the results")
+    parser.add_argument('--baseline', help="earlier results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown, 0.2 for 20%%")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', action='append', help="run benchmarks whose name contains this, repeatable")
+    parser.add_argument('--quick', action='store_true', help="smallest size of each benchmark only")
+    args = parser.parse_args(argv)
+
+    def report(name, size, result):
+        print('{:<32} {:>9} {:>12.6f}s best {:>12.6f}s median'.format(name, size, result['best'], result['median']))
+
+    results = run_benchmarks(only=args.only, quick=args.quick, repeat=args.repeat, report=report)
+    for name, sizes in results.items():
+        if 'skipped' in sizes:
+            print('{:<32} skipped: {}'.format(name, sizes['skipped']))
+    save_results(results, args.output)
+
+    status = 0
+    if any(name.startswith('import.') for name in results):
+        for module, heavy in check_imports().items():
+            print('EAGER IMPORT {}: {}'.format(module, ', '.join(heavy)))
+            status = 1
+
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), threshold=args.threshold)
+        for name, size, before, after, ratio in regressions:
+            print('REGRESSION {} [{}]: {:.6f}s -> {:.6f}s ({:.2f}x)'.format(name, size, before, after, ratio))
+        if regressions:
+            return 1
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,166 @@
+import numpy as np
+
+__all__ = ["Curve2D", "ParametricCurve2D"]
+
+# Curves given as vectorized functions instead of pre-sampled points. Samples
+# start uniform over the domain and each interval is split only while its
+# midpoint lands more than `tolerance` pixels off the chord, so straight parts
+# stay coarse and sharp features get refined. Every round of midpoints is
+# evaluated in one call of the function.
+#
+# Near a pole the samples run off towards infinity, so the curve keeps a
+# window, by default a wide box around the quartiles of its uniform samples.
+# Intervals lying wholly beyond one side of the window are not
+# refined, the line is broken where it jumps across the window, and bounds
+# only count samples inside it.
+
+FENCE = 10
+
+def chord_deviation(a, b, m):
+    # distance from m to the segment ab, row by row
+    ab = b - a
+    am = m - a
+    length2 = np.einsum('ij,ij->i', ab, ab)
+    t = np.clip(np.einsum('ij,ij->i', am, ab) / np.where(length2 > 0, length2, 1), 0, 1)
+    return np.hypot(*(am - t[:, None] * ab).T)
+
+def sample_window(pts, fence=FENCE):
+    # lower and upper corners of the box reaching fence interquartile ranges
+    # past the quartiles of the finite points; an axis the points don't
+    # spread along is left open
+    pts = pts[np.isfinite(pts).all(axis=1)]
+    if not len(pts):
+        return np.full(2, -np.inf), np.full(2, np.inf)
+    q1, q3 = np.percentile(pts, [25, 75], axis=0)
+    spread = q3 - q1
+    flat = spread <= 1e-9 * np.maximum(1, np.maximum(abs(q1), abs(q3)))
+    return np.where(flat, -np.inf, q1 - fence * spread), np.where(flat, np.inf, q3 + fence * spread)
+
+def beyond(pts, window):
+    # -1, 0 or 1 per point and axis: below, inside or above the window
+    lower, upper = window
+    with np.errstate(invalid='ignore'):
+        return (pts > upper).astype(int) - (pts < lower)
+
+def adaptive_sample(evaluate, domain, scale, tolerance=0.5, initial_samples=33, max_depth=12, window=None):
+    ts = np.linspace(domain[0], domain[1], initial_samples)
+    pts = evaluate(ts)
+    active = np.ones(len(ts) - 1, dtype=bool)
+    scale = np.asarray(scale, dtype=float)
+    if window is None:
+        window = (np.full(2, -np.inf), np.full(2, np.inf))
+
+    for _ in range(max_depth):
+        idx = np.nonzero(active)[0]
+        if not len(idx):
+            break
+        tm = (ts[idx] + ts[idx + 1]) / 2
+        pm = evaluate(tm)
+
+        a, b, m = pts[idx] * scale, pts[idx + 1] * scale, pm * scale
+        a_ok, b_ok, m_ok = (np.isfinite(p).all(axis=1) for p in (a, b, m))
+        with np.errstate(invalid='ignore'):
+            deviation = np.where(a_ok & b_ok, chord_deviation(a, b, m), np.inf)
+        # intervals touching a gap keep splitting to find its edge, unless
+        # there is no finite point in them at all
+        split = (deviation > tolerance) & (a_ok | b_ok | m_ok)
+        # nothing to find in an interval that stays off one side of the window
+        side_a, side_b, side_m = (beyond(p, window) for p in (pts[idx], pts[idx + 1], pm))
+        split &= ~((side_a != 0) & (side_a == side_b) & (side_a == side_m)).any(axis=1)
+
+        where = idx[split] + 1
+        ts = np.insert(ts, where, tm[split])
+        pts = np.insert(pts, where, pm[split], axis=0)
+        active = np.zeros(len(ts) - 1, dtype=bool)
+        first_halves = idx[split] + np.arange(np.count_nonzero(split))
+        active[first_halves] = True
+        active[first_halves + 1] = True
+
+    # a step from one side of the window clear to the other is a pole, not
+    # part of the curve
+    sides = beyond(pts, window)
+    jumps = np.nonzero((sides[:-1] * sides[1:] < 0).any(axis=1))[0]
+    return np.insert(pts, jumps + 1, np.nan, axis=0)
+
+class ParametricCurve2D():
+    # function(t) takes an array of parameters and returns the points, either
+    # as an (n, 2) array or as a pair of x and y arrays. limits, as
+    # ((xmin, xmax), (ymin, ymax)), replaces the automatic window.
+    def __init__(self, function, domain=(0,1), color='black', linestyle='solid', label=None, tolerance=0.5, initial_samples=33, max_depth=12, limits=None):
+        self.function = function
+        self.domain = domain
+        self.color = color
+        self.linestyle = linestyle
+        self.label = label
+        self.tolerance = tolerance
+        self.initial_samples = initial_samples
+        self.max_depth = max_depth
+        self.limits = limits
+        self._evaluations = 0
+        self._window = None
+        self._nominal_scale = None
+        self._samples = {}
+
+    def points_at(self, ts):
+        with np.errstate(all='ignore'):
+            pts = self.function(ts)
+        if isinstance(pts, (tuple, list)):
+            return np.column_stack(np.broadcast_arrays(*pts, ts)[:2])
+        return pts
+
+    def evaluate(self, ts):
+        self._evaluations += len(ts)
+        return np.asarray(self.points_at(ts), dtype=float).reshape(len(ts), 2)
+
+    def window(self):
+        if self._window is None:
+            coarse = self.evaluate(np.linspace(self.domain[0], self.domain[1], self.initial_samples))
+            if self.limits is not None:
+                self._window = tuple(np.array(self.limits, dtype=float).T)
+            else:
+                self._window = sample_window(coarse)
+            inside = coarse[(beyond(coarse, self._window) == 0).all(axis=1) & np.isfinite(coarse).all(axis=1)]
+            extent = np.ptp(inside, axis=0) if len(inside) else np.ones(2)
+            self._nominal_scale = 600 / np.where(extent > 0, extent, 1)
+        return self._window
+
+    def samples(self, scale=None):
+        # scale is pixels per data unit along x and y; without one the curve
+        # is sampled as if the extent of its uniform samples inside the
+        # window filled a 600 pixel square
+        if scale is None:
+            self.window()
+            scale = self._nominal_scale
+        scale = tuple(np.asarray(scale, dtype=float).tolist())
+        if scale not in self._samples:
+            if len(self._samples) >= 8:
+                self._samples.clear()
+            self._samples[scale] = adaptive_sample(self.evaluate, self.domain, scale, self.tolerance,
+                                                   self.initial_samples, self.max_depth, self.window())
+        return self._samples[scale]
+
+    def bounds(self):
+        pts = self.samples()
+        pts = pts[(beyond(pts, self.window()) == 0).all(axis=1) & np.isfinite(pts).all(axis=1)]
+        if not len(pts):
+            return np.zeros(2), np.zeros(2)
+        return pts.min(axis=0), pts.max(axis=0)
+
+    def transformed(self, transform):
+        # sampled again after the transform, so refinement follows the new shape
+        return ParametricCurve2D(lambda ts: transform.apply(self.evaluate(ts)), self.domain,
+                                 color=self.color, linestyle=self.linestyle, label=self.label,
+                                 tolerance=self.tolerance, initial_samples=self.initial_samples,
+                                 max_depth=self.max_depth)
+
+class Curve2D(ParametricCurve2D):
+    # the graph y = function(x) over domain, optionally only y_range of it
+    def __init__(self, function, domain=(-10,10), y_range=None, **options):
+        if y_range is not None:
+            options['limits'] = (domain, y_range)
+        super().__init__(function, domain, **options)
+
+    def points_at(self, ts):
+        with np.errstate(all='ignore'):
+            ys = np.broadcast_to(np.asarray(self.function(ts), dtype=float), np.shape(ts))
+        return np.column_stack((ts, ys))
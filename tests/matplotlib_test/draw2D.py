@@ -1,12 +1,26 @@
-from math import ceil, floor, sqrt
+import os
+from collections import defaultdict
+from copy import copy
+from math import ceil, floor
 
 import numpy as np
 
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.pyplot import xlim, ylim
+from curve import Curve2D, ParametricCurve2D
+from figure_pool import default_pool, figure_output, style_name
+from label_layout import label_collection, place_labels
+from lazy_imports import lazy_attributes
+from point_stream import PointStream2D
+from render_stats import null_stats, recorder
 
-__all__ = ["Point2D", "Points2D", "Line2D", "Arrow2D", "draw2D"]
+__all__ = ["Point2D", "Points2D", "PointStream2D", "Line2D", "Arrow2D", "Curve2D", "ParametricCurve2D", "draw2D", "render2D"]
+
+# matplotlib is imported by the functions that draw, so importing this module
+# for the object classes stays cheap; outside readers still find it here, as
+# in `from draw2D import plt`
+__getattr__ = lazy_attributes(__name__, {
+    'matplotlib': 'matplotlib',
+    'plt': 'matplotlib.pyplot',
+})
 
 class Point2D():
     def __init__(self, x, y, color='black', label=None):
@@ -16,11 +30,33 @@ class Point2D():
         self.label = label
 
 class Points2D():
-    def __init__(self, *points, color='black'):
-        length = len(points)
-        points = list(map(process_pt, points, [color]*length))
-        self.points = list(points)
+    def __init__(self, *points, color='black', colors=None, labels=None):
+        if len(points) == 1 and isinstance(points[0], np.ndarray):
+            coords = np.asarray(points[0], dtype=float).reshape(-1, 2)
+        else:
+            coords, pt_colors, pt_labels = process_pts(points, color)
+            colors = pt_colors if colors is None else colors
+            labels = pt_labels if labels is None else labels
+        if labels is not None and not isinstance(labels, dict):
+            labels = {i: l for i, l in enumerate(labels) if l is not None}
+        self.x = coords[:, 0]
+        self.y = coords[:, 1]
         self.color = color
+        self.colors = colors
+        self.labels = labels or {}
+
+    @classmethod
+    def from_arrays(cls, x, y, color='black', colors=None, labels=None):
+        return cls(np.column_stack((x, y)), color=color, colors=colors, labels=labels)
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def points(self):
+        colors = self.colors if self.colors is not None else [self.color] * len(self)
+        return [Point2D(x, y, color=c, label=self.labels.get(i))
+                for i, (x, y, c) in enumerate(zip(self.x.tolist(), self.y.tolist(), colors))]
 
 class Line2D():
     def __init__(self, start_point, end_point=(0,0), color='gray', linestyle='solid', label=None):
@@ -38,26 +74,33 @@ class Arrow2D():
         self.linestyle = linestyle
         self.label = label
 
-def process_pt(pt, color):
-    length = len(pt)
-    x, y, col, label = 0, 0, color, None
-    if length > 0:
-        x = pt[0]
-        if length > 1:
-            y = pt[1]
-            if length > 2:
-                col = pt[2]
-                if length > 3:
-                    label = pt[3]
-    return Point2D(x, y, color=col, label=label)
+def process_pts(points, color):
+    coords = np.zeros((len(points), 2))
+    colors = [color] * len(points)
+    labels = {}
+    for i, pt in enumerate(points):
+        length = len(pt)
+        coords[i, :min(length, 2)] = pt[:2]
+        if length > 2:
+            colors[i] = pt[2]
+            if length > 3 and pt[3] is not None:
+                labels[i] = pt[3]
+    if all(c is color for c in colors):
+        colors = None
+    return coords, colors, labels
     
 def extract_vectors_2D(objects):
     for obj in objects:
         if type(obj) == Point2D:
             yield (obj.x, obj.y)
         elif type(obj) == Points2D:
-            for p in obj.points:
-                yield (p.x, p.y)
+            yield from zip(obj.x.tolist(), obj.y.tolist())
+        elif type(obj) == PointStream2D:
+            for chunk in obj.chunks():
+                yield from map(tuple, chunk.tolist())
+        elif type(obj) in (Curve2D, ParametricCurve2D):
+            samples = obj.samples()
+            yield from map(tuple, samples[np.isfinite(samples).all(axis=1)].tolist())
         elif type(obj) == Line2D:
             yield obj.start_point
             yield obj.end_point
@@ -67,6 +110,112 @@ def extract_vectors_2D(objects):
         else:
             raise TypeError("Unrecognized object: {}".format(obj))
 
+def transform_objects_2D(transform, objects):
+    for obj in objects:
+        obj = copy(obj)
+        if type(obj) == Point2D:
+            obj.x, obj.y = transform.apply((obj.x, obj.y))
+        elif type(obj) == Points2D:
+            xy = transform.apply(np.column_stack((obj.x, obj.y)))
+            obj.x, obj.y = xy[:, 0], xy[:, 1]
+        elif type(obj) in (PointStream2D, Curve2D, ParametricCurve2D):
+            obj = obj.transformed(transform)
+        elif type(obj) == Line2D:
+            obj.start_point = transform.apply(obj.start_point)
+            obj.end_point = transform.apply(obj.end_point)
+        elif type(obj) == Arrow2D:
+            obj.head = transform.apply(obj.head)
+            obj.tail = transform.apply(obj.tail)
+        else:
+            raise TypeError("Unrecognized object: {}".format(obj))
+        yield obj
+
+def bounds_2D(objects):
+    # running min/max over every coordinate, always including the origin
+    lower, upper = np.zeros(2), np.zeros(2)
+    for obj in objects:
+        if type(obj) == Points2D:
+            if len(obj):
+                obj_lower = (obj.x.min(), obj.y.min())
+                obj_upper = (obj.x.max(), obj.y.max())
+            else:
+                continue
+        elif type(obj) in (PointStream2D, Curve2D, ParametricCurve2D):
+            obj_lower, obj_upper = obj.bounds()
+        else:
+            vectors = np.array(list(extract_vectors_2D([obj])), dtype=float)
+            obj_lower, obj_upper = vectors.min(axis=0), vectors.max(axis=0)
+        np.minimum(lower, obj_lower, out=lower)
+        np.maximum(upper, obj_upper, out=upper)
+    return lower.tolist(), upper.tolist()
+
+def style_key(obj):
+    from matplotlib.colors import to_rgba
+    return (to_rgba(obj.color), repr(obj.linestyle))
+
+def arrow_polygons(tails, heads, head_length, head_width, width=0.001):
+    # same outline as matplotlib's FancyArrow for ax.arrow(..., head_width,
+    # head_length), with the shaft shortened so the tip lands on the head
+    tails = np.asarray(tails, dtype=float).reshape(-1, 2)
+    heads = np.asarray(heads, dtype=float).reshape(-1, 2)
+    d = heads - tails
+    length = np.hypot(d[:, 0], d[:, 1])
+    if np.any(length == 0):
+        raise ValueError("direction vector must be non-zero")
+    d *= ((length - head_length) / length)[:, None]
+    distance = np.hypot(d[:, 0], d[:, 1])
+
+    hl, hw, lw = head_length, head_width / 2, width / 2
+    outline = np.zeros((len(d), 8, 2))
+    outline[:, :, 0] = [hl, 0, 0, 0, 0, 0, 0, hl]
+    outline[:, 3:5, 0] = -distance[:, None]
+    outline[:, :, 1] = [0, -hw, -lw, -lw, lw, lw, hw, 0]
+
+    nonzero = distance != 0
+    cx = np.where(nonzero, d[:, 0] / np.where(nonzero, distance, 1), 0)
+    sx = np.where(nonzero, d[:, 1] / np.where(nonzero, distance, 1), 1)
+    ox, oy = (tails + d).T
+    x, y = outline[:, :, 0], outline[:, :, 1]
+    return np.stack((x * cx[:, None] - y * sx[:, None] + ox[:, None],
+                     x * sx[:, None] + y * cx[:, None] + oy[:, None]), axis=-1)
+
+def draw_density(ax, obj, by_color=False):
+    # one histogram bin per output pixel, drawn as an image in place of a scatter
+    from matplotlib.colors import to_rgba_array
+
+    bbox = ax.get_window_extent()
+    bins = (max(1, int(round(bbox.width))), max(1, int(round(bbox.height))))
+    (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+
+    if type(obj) == PointStream2D:
+        chunks = ((chunk[:, 0], chunk[:, 1]) for chunk in obj.chunks())
+    else:
+        chunks = [(obj.x, obj.y)]
+
+    if by_color and type(obj) == Points2D and obj.colors is not None:
+        layers, category = np.unique(to_rgba_array(obj.colors), axis=0, return_inverse=True)
+        category = category.ravel()
+    else:
+        layers, category = to_rgba_array([obj.color]), None
+
+    counts = np.zeros((len(layers), bins[0], bins[1]))
+    for x, y in chunks:
+        for i in range(len(layers)):
+            mask = slice(None) if category is None else category == i
+            counts[i] += np.histogram2d(x[mask], y[mask], bins=bins, range=[(x0, x1), (y0, y1)])[0]
+
+    images = []
+    for color, layer in zip(layers, counts):
+        layer = layer.T
+        image = np.empty(layer.shape + (4,))
+        image[..., :3] = color[:3]
+        image[..., 3] = color[3] * np.log1p(layer) / np.log1p(max(layer.max(), 1))
+        images.append(ax.imshow(image, origin='lower', extent=(x0, x1, y0, y1), aspect='auto', interpolation='nearest', zorder=4))
+
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
+    return images
+
 def get_label_xy(start_point, end_point=None):
     x1, y1 = start_point
     
@@ -91,22 +240,220 @@ def get_label_xy(start_point, end_point=None):
     yield lx
     yield ly
 
-def draw2D(*objects, origin=False, axes=True, axes_labels=False, ticks=True, tick_labels=True, grid=True, grid_size=(1,1), dark_mode=True, width=6, dpi=100, nice_aspect_ratio=True, save_as=None):
+def group_objects_2D(objects):
+    lone_points = []
+    clouds = []
+    lines = defaultdict(list)
+    curves = []
+    arrows = defaultdict(list)
+    labels = []
+    for obj in objects:
+        if type(obj) == Point2D:
+            lone_points.append(obj)
+            if obj.label is not None:
+                labels.append((obj.label, tuple(get_label_xy((obj.x, obj.y)))))
+        elif type(obj) == Points2D:
+            clouds.append(obj)
+            for i, txt in obj.labels.items():
+                labels.append((txt, tuple(get_label_xy((obj.x[i], obj.y[i])))))
+        elif type(obj) == PointStream2D:
+            clouds.append(obj)
+        elif type(obj) == Line2D:
+            lines[style_key(obj)].append(obj)
+            if obj.label is not None:
+                labels.append((obj.label, tuple(get_label_xy(obj.start_point, obj.end_point))))
+        elif type(obj) in (Curve2D, ParametricCurve2D):
+            curves.append(obj)
+            if obj.label is not None:
+                samples = obj.samples()
+                samples = samples[np.isfinite(samples).all(axis=1)]
+                if len(samples) > 1:
+                    mid = len(samples) // 2
+                    labels.append((obj.label, tuple(get_label_xy(samples[mid - 1], samples[mid]))))
+        elif type(obj) == Arrow2D:
+            arrows[style_key(obj)].append(obj)
+            if obj.label is not None:
+                labels.append((obj.label, tuple(get_label_xy(obj.tail, obj.head))))
+        else:
+            raise TypeError("Unrecognized object: {}".format(obj))
+    return lone_points, clouds, lines, curves, arrows, labels
 
-    fig = plt.gcf()
-    
-    if dark_mode:
-        plt.style.use('dark_background')
-        axes_color = 'white'
-    else:
-        plt.style.use('default')
-        axes_color = 'black'
-    
-    all_vectors = list(extract_vectors_2D(objects))
-    all_x, all_y = zip(*all_vectors)
+def remove_artists(artist):
+    if isinstance(artist, list):
+        for a in artist:
+            a.remove()
+    elif artist is not None:
+        artist.remove()
+
+class Scene2D():
+    # The artists drawing a set of objects, batched into one artist per
+    # distinct style. update() reuses the artists already made for each group
+    # and only creates new ones for groups it has not seen, so a new set of
+    # objects can be swapped in without rebuilding the axes.
+
+    def __init__(self, ax, density_threshold=1000000, density_by_color=False, max_labels=None, stats=None):
+        self.ax = ax
+        self.stats = stats if stats is not None else null_stats
+        self.density_threshold = density_threshold
+        self.density_by_color = density_by_color
+        self.max_labels = max_labels
+        self.lone_points = None
+        self.clouds = []
+        self.lines = {}
+        self.curves = []
+        self.arrows = {}
+        self.labels = None
 
-    max_x, min_x = max(0,*all_x), min(0,*all_x)
-    max_y, min_y = max(0,*all_y), min(0,*all_y)
+    def update(self, objects):
+        lone_points, clouds, lines, curves, arrows, labels = group_objects_2D(objects)
+        self.update_lone_points(lone_points)
+        self.update_clouds(clouds)
+        self.update_lines(lines)
+        self.update_curves(curves)
+        self.update_arrows(arrows)
+        self.update_labels(labels)
+        return self.artists
+
+    @property
+    def artists(self):
+        artists = [self.lone_points] if self.lone_points is not None else []
+        for cloud in self.clouds:
+            artists.extend(cloud if isinstance(cloud, list) else [cloud])
+        artists.extend(self.lines.values())
+        artists.extend(self.curves)
+        artists.extend(self.arrows.values())
+        if self.labels is not None:
+            artists.append(self.labels)
+        return artists
+
+    def update_lone_points(self, points):
+        if not points and self.lone_points is None:
+            return
+        xy = np.array([(p.x, p.y) for p in points], dtype=float).reshape(-1, 2)
+        colors = [p.color for p in points]
+        self.stats.add_points(len(points))
+        if self.lone_points is None:
+            self.lone_points = self.ax.scatter(xy[:, 0], xy[:, 1], color=colors, zorder=4)
+            self.stats.add_artists('Point2D')
+        else:
+            self.lone_points.set_offsets(xy)
+            if colors:
+                self.lone_points.set_color(colors)
+
+    def is_dense(self, obj):
+        return self.density_threshold is not None and len(obj) > self.density_threshold
+
+    def update_clouds(self, clouds):
+        from matplotlib.collections import PathCollection
+
+        for i, obj in enumerate(clouds):
+            old = self.clouds[i] if i < len(self.clouds) else None
+            self.stats.add_points(len(obj))
+            if self.is_dense(obj):
+                remove_artists(old)
+                new = draw_density(self.ax, obj, by_color=self.density_by_color)
+                self.stats.add_artists(type(obj).__name__, len(new))
+            else:
+                if type(obj) == PointStream2D:
+                    xy = obj.gather(self.density_threshold)
+                    colors = obj.color
+                else:
+                    xy = np.column_stack((obj.x, obj.y))
+                    colors = obj.colors if obj.colors is not None else obj.color
+                if isinstance(old, PathCollection):
+                    old.set_offsets(xy)
+                    old.set_color(colors)
+                    new = old
+                else:
+                    remove_artists(old)
+                    new = self.ax.scatter(xy[:, 0], xy[:, 1], color=colors, zorder=4)
+                    self.stats.add_artists(type(obj).__name__)
+            if i < len(self.clouds):
+                self.clouds[i] = new
+            else:
+                self.clouds.append(new)
+        for old in self.clouds[len(clouds):]:
+            remove_artists(old)
+        del self.clouds[len(clouds):]
+
+    def update_lines(self, lines):
+        from matplotlib.collections import LineCollection
+
+        for key, group in lines.items():
+            segments = [(obj.start_point, obj.end_point) for obj in group]
+            self.stats.add_segments(len(segments))
+            if key in self.lines:
+                self.lines[key].set_segments(segments)
+            else:
+                self.lines[key] = self.ax.add_collection(LineCollection(
+                    segments, colors=group[0].color, linestyles=group[0].linestyle, zorder=2))
+                self.stats.add_artists('Line2D')
+        for key in self.lines.keys() - lines.keys():
+            self.lines[key].set_segments([])
+
+    def pixel_scale(self):
+        bbox = self.ax.get_window_extent()
+        (x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+        return (bbox.width / abs(x1 - x0), bbox.height / abs(y1 - y0))
+
+    def update_curves(self, curves):
+        # resampled against the current limits, so the tolerance is in pixels
+        scale = self.pixel_scale()
+        for i, obj in enumerate(curves):
+            samples = obj.samples(scale)
+            self.stats.add_segments(max(len(samples) - 1, 0))
+            if i < len(self.curves):
+                line = self.curves[i]
+                line.set_data(samples[:, 0], samples[:, 1])
+                line.set_color(obj.color)
+                line.set_linestyle(obj.linestyle)
+                line.set_visible(True)
+            else:
+                line, = self.ax.plot(samples[:, 0], samples[:, 1], color=obj.color,
+                                     linestyle=obj.linestyle, scalex=False, scaley=False, zorder=2)
+                self.curves.append(line)
+                self.stats.add_artists(type(obj).__name__)
+        for line in self.curves[len(curves):]:
+            line.set_visible(False)
+
+    def update_arrows(self, arrows):
+        import matplotlib
+        from matplotlib.collections import PolyCollection
+
+        head_length = (self.ax.get_xlim()[1] - self.ax.get_xlim()[0]) / 20.
+        for key, group in arrows.items():
+            polygons = arrow_polygons([obj.tail for obj in group], [obj.head for obj in group],
+                                      head_length, head_length/1.5)
+            self.stats.add_segments(len(group))
+            if key in self.arrows:
+                self.arrows[key].set_verts(polygons)
+            else:
+                self.arrows[key] = self.ax.add_collection(PolyCollection(
+                    polygons, facecolors=group[0].color, edgecolors=group[0].color,
+                    linestyles=group[0].linestyle, linewidths=matplotlib.rcParams['patch.linewidth'],
+                    joinstyle='miter', capstyle='butt', zorder=3))
+                self.stats.add_artists('Arrow2D')
+        for key in self.arrows.keys() - arrows.keys():
+            self.arrows[key].set_verts([])
+
+    def update_labels(self, labels):
+        # placed against the current limits; colliding labels are dropped
+        if not labels and self.labels is None:
+            return
+        xy = np.array([xy for _, xy in labels], dtype=float).reshape(-1, 2)
+        kept, paths = place_labels([txt for txt, _ in labels], self.ax.transData.transform(xy),
+                                   self.ax.get_window_extent().extents, self.ax.figure.dpi,
+                                   max_labels=self.max_labels)
+        if self.labels is None:
+            self.labels = self.ax.add_collection(label_collection(
+                self.ax.figure, paths, xy[kept], self.ax.transData), autolim=False)
+            self.stats.add_artists('label')
+        else:
+            self.labels.set_paths(paths)
+            self.labels.set_offsets(xy[kept].reshape(-1, 2))
+
+def fit_limits_2D(ax, objects, grid_size):
+    (min_x, min_y), (max_x, max_y) = bounds_2D(objects)
 
     x_size = max_x-min_x
     y_size = max_y-min_y
@@ -115,92 +462,63 @@ def draw2D(*objects, origin=False, axes=True, axes_labels=False, ticks=True, tic
     x_padding = max(ceil(0.05 * x_size), grid_size[0])
     y_padding = max(ceil(0.05 * y_size), grid_size[1])
 
-    def round_up_to_multiple(val,size):
-        return floor((val + size) / size) * size
+    ax.set_xlim(floor((min_x - x_padding) / grid_size[0]) * grid_size[0],
+                ceil((max_x + x_padding) / grid_size[0]) * grid_size[0])
+    ax.set_ylim(floor((min_y - y_padding) / grid_size[1]) * grid_size[1],
+                ceil((max_y + y_padding) / grid_size[1]) * grid_size[1])
 
-    def round_down_to_multiple(val,size):
-        return -floor((-val - size) / size) * size
+def set_ticks_2D(ax, grid_size):
+    ax.set_xticks(np.arange(ax.get_xlim()[0],ax.get_xlim()[1],grid_size[0]))
+    ax.set_yticks(np.arange(ax.get_ylim()[0],ax.get_ylim()[1],grid_size[1])) 
 
-    plt.xlim(floor((min_x - x_padding) / grid_size[0]) * grid_size[0],
-            ceil((max_x + x_padding) / grid_size[0]) * grid_size[0])
-    plt.ylim(floor((min_y - y_padding) / grid_size[1]) * grid_size[1],
-            ceil((max_y + y_padding) / grid_size[1]) * grid_size[1])
+def build2D(fig, *objects, origin=False, axes=True, axes_labels=False, ticks=True, tick_labels=True, grid=True, grid_size=(1,1), dark_mode=True, width=6, dpi=100, nice_aspect_ratio=True, transform=None, density_threshold=1000000, density_by_color=False, max_labels=None, stats=None):
 
-    if origin:
-        plt.scatter([0],[0], color=axes_color, marker='x', zorder=3)
+    stats, owned = recorder(stats, '2D')
 
-    ax = plt.gca()
-    
-    if not tick_labels:
-        ax.set_xticklabels([])
-        ax.set_yticklabels([])
-    
-    if not ticks:
-        ax.set_xticks([])
-        ax.set_yticks([])
-    else:
-        ax.set_xticks(np.arange(plt.xlim()[0],plt.xlim()[1],grid_size[0]))
-        ax.set_yticks(np.arange(plt.ylim()[0],plt.ylim()[1],grid_size[1])) 
-    
-    if grid:
-        plt.grid(True, alpha=0.4)
-        
-    ax.set_axisbelow(True)
+    if transform is not None:
+        with stats.stage('transform'):
+            objects = tuple(transform_objects_2D(transform, objects))
 
-    if axes_labels:
-        ax.set_xlabel('x')
-        ax.set_ylabel('y')
+    ax = fig.gca()
+    axes_color = 'white' if dark_mode else 'black'
     
-    if axes:
-        ax.axhline(linewidth=2, color=axes_color, zorder=1)
-        ax.axvline(linewidth=2, color=axes_color, zorder=1)
+    with stats.stage('limits'):
+        fit_limits_2D(ax, objects, grid_size)
 
-    # Objects
-    for obj in objects:
-        if type(obj) == Point2D:
-            plt.scatter(obj.x, obj.y, color=obj.color, zorder=4)
-            if obj.label is not None:
-                lx, ly = get_label_xy((obj.x, obj.y))
-                plt.annotate(obj.label, (lx, ly), xytext=(lx, ly), ha='center')
-        elif type(obj) == Points2D:
-            all_x = [p.x for p in obj.points]
-            all_y = [p.y for p in obj.points]
-            all_colors = [p.color for p in obj.points]
-            all_labels = [p.label for p in obj.points]
-            plt.scatter(all_x, all_y, color=all_colors, zorder=4)
-            for i, txt in enumerate(all_labels):
-                if txt is not None:
-                    lx, ly = get_label_xy((all_x[i], all_y[i]))
-                    plt.annotate(txt, (lx, ly), xytext=(lx, ly), ha='center')
-        elif type(obj) == Line2D:
-            x1, y1 = obj.start_point
-            x2, y2 = obj.end_point
-            plt.plot([x1,x2],[y1,y2], color=obj.color, linestyle=obj.linestyle, zorder=2)
-            if obj.label is not None:
-                lx, ly = get_label_xy(obj.start_point, obj.end_point)
-                plt.annotate(obj.label, xy=(lx, ly), xytext=(lx, ly), ha='center')
-        elif type(obj) == Arrow2D:
-            head, tail = obj.head, obj.tail
-            head_length = (xlim()[1] - xlim()[0]) / 20.
-            length = sqrt((head[0]-tail[0])**2 + (head[1]-tail[1])**2)
-            new_length = length - head_length
-            new_y = (head[1] - tail[1]) * (new_length / length)
-            new_x = (head[0] - tail[0]) * (new_length / length)
-            ax.arrow(tail[0], tail[1], new_x, new_y,
-                head_width=head_length/1.5, head_length=head_length,
-                fc=obj.color, ec=obj.color, ls=obj.linestyle, zorder=3)
-            if obj.label is not None:
-                lx, ly = get_label_xy(tail, head)
-                ax.annotate(obj.label, xy=(lx, ly), xytext=(lx, ly), ha='center')
+    if origin:
+        ax.scatter([0],[0], color=axes_color, marker='x', zorder=3)
+    
+    with stats.stage('ticks'):
+        if not tick_labels:
+            ax.set_xticklabels([])
+            ax.set_yticklabels([])
+        
+        if not ticks:
+            ax.set_xticks([])
+            ax.set_yticks([])
         else:
-            raise TypeError("Unrecognized object: {}".format(obj))
+            set_ticks_2D(ax, grid_size)
     
-    # Size
+    with stats.stage('axes'):
+        if grid:
+            ax.grid(True, alpha=0.4)
+            
+        ax.set_axisbelow(True)
+
+        if axes_labels:
+            ax.set_xlabel('x')
+            ax.set_ylabel('y')
+        
+        if axes:
+            ax.axhline(linewidth=2, color=axes_color, zorder=1)
+            ax.axvline(linewidth=2, color=axes_color, zorder=1)
+
+    # Size, set before the objects since density images depend on it
     current_size = fig.get_size_inches()
     
     if nice_aspect_ratio:
-        coords_height = (ylim()[1] - ylim()[0])
-        coords_width = (xlim()[1] - xlim()[0])
+        coords_height = (ax.get_ylim()[1] - ax.get_ylim()[0])
+        coords_width = (ax.get_xlim()[1] - ax.get_xlim()[0])
         fig.set_size_inches(width, width * coords_height / coords_width)
         fig.set_dpi(dpi)
     else:
@@ -208,9 +526,45 @@ def draw2D(*objects, origin=False, axes=True, axes_labels=False, ticks=True, tic
         fig.set_size_inches(width, current_size[1]/ratio)
         fig.set_dpi(dpi)
 
+    # Objects
+    with stats.stage('artists'):
+        scene = Scene2D(ax, density_threshold=density_threshold, density_by_color=density_by_color, max_labels=max_labels, stats=stats)
+        scene.update(objects)
+
+    if owned:
+        stats.finish()
+    return scene
+
+def draw2D(*objects, dark_mode=True, save_as=None, stats=None, **options):
+
+    import matplotlib.pyplot as plt
+
+    stats, owned = recorder(stats, '2D')
+
+    plt.style.use(style_name(dark_mode))
+    fig = plt.gcf()
+
+    build2D(fig, *objects, dark_mode=dark_mode, stats=stats, **options)
+
     if save_as:
-        plt.savefig(save_as, dpi=fig.dpi)
+        with stats.stage('savefig'):
+            fig.savefig(save_as, dpi=fig.dpi)
+        if isinstance(save_as, (str, os.PathLike)):
+            stats.set_output(os.path.getsize(save_as))
     
-    plt.show()
+    with stats.stage('show'):
+        plt.show()
 
+    if owned:
+        stats.finish()
 
+def render2D(*objects, format='png', dark_mode=True, pool=default_pool, stats=None, **options):
+    stats, owned = recorder(stats, '2D')
+    with pool.figure(dark_mode) as fig:
+        build2D(fig, *objects, dark_mode=dark_mode, stats=stats, **options)
+        with stats.stage('output'):
+            data = figure_output(fig, format)
+    stats.set_output(data)
+    if owned:
+        stats.finish()
+    return data
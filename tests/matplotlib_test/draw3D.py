@@ -1,14 +1,25 @@
-from math import sqrt
+import os
+from copy import copy
+from functools import lru_cache
 
 import numpy as np
 
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator
-from mpl_toolkits.mplot3d import Axes3D, proj3d
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from figure_pool import default_pool, figure_output, style_name
+from label_layout import label_collection, place_labels
+from lazy_imports import lazy_attributes
+from point_stream import PointStream3D
+from render_stats import recorder
 
-__all__ = ["Point3D", "Points3D", "Line3D", "Arrow3D", "draw3D"]
+__all__ = ["Point3D", "Points3D", "PointStream3D", "Line3D", "Arrow3D", "draw3D", "render3D"]
+
+# matplotlib and mplot3d are imported by the functions that draw, so
+# importing this module for the object classes stays cheap; outside readers
+# still find them here, as in `from draw3D import plt`. matplotlib registers
+# the '3d' projection itself, without mpl_toolkits having been imported.
+__getattr__ = lazy_attributes(__name__, {
+    'matplotlib': 'matplotlib',
+    'plt': 'matplotlib.pyplot',
+})
 
 class Point3D():
     def __init__(self, x, y, z, color='black', label=None):
@@ -19,11 +30,34 @@ class Point3D():
         self.label = label
 
 class Points3D():
-    def __init__(self, *points, color='black'):
-        length = len(points)
-        points = list(map(process_pt, points, [color]*length))
-        self.points = list(points)
+    def __init__(self, *points, color='black', colors=None, labels=None):
+        if len(points) == 1 and isinstance(points[0], np.ndarray):
+            coords = np.asarray(points[0], dtype=float).reshape(-1, 3)
+        else:
+            coords, pt_colors, pt_labels = process_pts(points, color)
+            colors = pt_colors if colors is None else colors
+            labels = pt_labels if labels is None else labels
+        if labels is not None and not isinstance(labels, dict):
+            labels = {i: l for i, l in enumerate(labels) if l is not None}
+        self.x = coords[:, 0]
+        self.y = coords[:, 1]
+        self.z = coords[:, 2]
         self.color = color
+        self.colors = colors
+        self.labels = labels or {}
+
+    @classmethod
+    def from_arrays(cls, x, y, z, color='black', colors=None, labels=None):
+        return cls(np.column_stack((x, y, z)), color=color, colors=colors, labels=labels)
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def points(self):
+        colors = self.colors if self.colors is not None else [self.color] * len(self)
+        return [Point3D(x, y, z, color=c, label=self.labels.get(i))
+                for i, (x, y, z, c) in enumerate(zip(self.x.tolist(), self.y.tolist(), self.z.tolist(), colors))]
 
 class Line3D():
     def __init__(self, start_point, end_point=(0,0,0), color='gray', linestyle='solid', label=None):
@@ -44,28 +78,30 @@ class Arrow3D():
         self.head_resolution = head_resolution
         self.label = label
 
-def process_pt(pt, color):
-    length = len(pt)
-    x, y, z, col, label = 0, 0, 0, color, None
-    if length > 0:
-        x = pt[0]
-        if length > 1:
-            y = pt[1]
-            if length > 2:
-                z = pt[2]
-                if length > 3:
-                    col = pt[3]
-                    if length > 4:
-                        label = pt[4]
-    return Point3D(x, y, z, color=col, label=label)
+def process_pts(points, color):
+    coords = np.zeros((len(points), 3))
+    colors = [color] * len(points)
+    labels = {}
+    for i, pt in enumerate(points):
+        length = len(pt)
+        coords[i, :min(length, 3)] = pt[:3]
+        if length > 3:
+            colors[i] = pt[3]
+            if length > 4 and pt[4] is not None:
+                labels[i] = pt[4]
+    if all(c is color for c in colors):
+        colors = None
+    return coords, colors, labels
     
 def extract_vectors_3D(objects):
     for obj in objects:
         if type(obj) == Point3D:
             yield (obj.x, obj.y, obj.z)
         elif type(obj) == Points3D:
-            for p in obj.points:
-                yield (p.x, p.y, p.z)
+            yield from zip(obj.x.tolist(), obj.y.tolist(), obj.z.tolist())
+        elif type(obj) == PointStream3D:
+            for chunk in obj.chunks():
+                yield from map(tuple, chunk.tolist())
         elif type(obj) == Line3D:
             yield obj.start_point
             yield obj.end_point
@@ -75,11 +111,196 @@ def extract_vectors_3D(objects):
         else:
             raise TypeError("Unrecognized object: {}".format(obj))
 
+def transform_objects_3D(transform, objects):
+    for obj in objects:
+        obj = copy(obj)
+        if type(obj) == Point3D:
+            obj.x, obj.y, obj.z = transform.apply((obj.x, obj.y, obj.z))
+        elif type(obj) == Points3D:
+            xyz = transform.apply(np.column_stack((obj.x, obj.y, obj.z)))
+            obj.x, obj.y, obj.z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+        elif type(obj) == PointStream3D:
+            obj = obj.transformed(transform)
+        elif type(obj) == Line3D:
+            obj.start_point = transform.apply(obj.start_point)
+            obj.end_point = transform.apply(obj.end_point)
+        elif type(obj) == Arrow3D:
+            obj.head = transform.apply(obj.head)
+            obj.tail = transform.apply(obj.tail)
+        else:
+            raise TypeError("Unrecognized object: {}".format(obj))
+        yield obj
+
 def draw_segment(ax, start, end, color="black", linestyle='solid'):
     all_x, all_y, all_z = [[start[i],end[i]] for i in range(0,3)]
     ax.plot(all_x, all_y, all_z, color=color, linestyle=linestyle)
 
+@lru_cache(maxsize=None)
+def unit_cone(head_resolution):
+    # base ring on the unit circle plus triangles fanning from it to the tip,
+    # which is vertex index head_resolution
+    theta = np.linspace(0, 2*np.pi, head_resolution, endpoint=False)
+    ring = np.stack((np.cos(theta), np.sin(theta)), axis=-1)
+    i = np.arange(head_resolution)
+    faces = np.stack((i, (i + 1) % head_resolution, np.full(head_resolution, head_resolution)), axis=-1)
+    return ring, faces
+
+def draw_arrows(ax, arrows, labels, projected=None):
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection, Poly3DCollection
+
+    tails = np.array([obj.tail for obj in arrows], dtype=float)
+    heads = np.array([obj.head for obj in arrows], dtype=float)
+    head_lengths = np.array([obj.head_length for obj in arrows], dtype=float)
+    head_radii = np.array([obj.head_radius for obj in arrows], dtype=float)
+
+    d = heads - tails
+    length = np.linalg.norm(d, axis=1)
+    if np.any(length == 0):
+        raise ValueError("direction vector must be non-zero")
+    d /= length[:, None]
+
+    shaft_ends = tails + d * (length - head_lengths)[:, None]
+    tips = heads
+
+    # shafts
+    shafts = np.stack((tails, shaft_ends), axis=1)
+    colors = [obj.color for obj in arrows]
+    linestyles = [obj.linestyle for obj in arrows]
+    if projected is not None:
+        projected.add_segments(shafts, colors, linestyles)
+    else:
+        ax.add_collection3d(Line3DCollection(shafts, colors=colors, linestyles=linestyles))
+    for obj, shaft_end, start in zip(arrows, shaft_ends, tails):
+        if obj.label is not None:
+            labels.append((obj.label, tuple(get_label_xyz(shaft_end, start))))
+
+    # orthonormal basis around each direction
+    up = np.where((np.abs(d[:, 2]) < 0.999)[:, None], [0., 0., 1.], [0., 1., 0.])
+    a = np.cross(d, up)
+    a /= np.linalg.norm(a, axis=1)[:, None]
+    b = np.cross(d, a)
+
+    # cone heads, one batch per mesh resolution, all merged into one collection
+    resolutions = np.array([obj.head_resolution for obj in arrows])
+    all_faces, all_colors = [], []
+    for resolution in np.unique(resolutions):
+        idx = np.nonzero(resolutions == resolution)[0]
+        ring, faces = unit_cone(int(resolution))
+        offsets = (ring[None, :, 0, None] * a[idx, None, :] + ring[None, :, 1, None] * b[idx, None, :])
+        vertices = np.concatenate((shaft_ends[idx, None, :] + head_radii[idx, None, None] * offsets,
+                                   tips[idx, None, :]), axis=1)
+        all_faces.append(vertices[:, faces].reshape(-1, 3, 3))
+        all_colors.extend(arrows[i].color for i in idx for _ in range(resolution))
+    if projected is not None:
+        projected.add_faces(np.concatenate(all_faces), all_colors)
+    else:
+        ax.add_collection3d(Poly3DCollection(np.concatenate(all_faces), facecolors=all_colors, edgecolors=all_colors))
+
+def draw_labels(ax, labels, max_labels=None):
+    from mpl_toolkits.mplot3d import proj3d
+    from projected3D import ProjectedLabelCollection
+
+    anchors = np.array([xyz for _, xyz in labels], dtype=float).reshape(-1, 3)
+    xs, ys, _ = proj3d.proj_transform(*anchors.T, ax.get_proj())
+    kept, paths = place_labels([txt for txt, _ in labels], ax.transData.transform(np.column_stack((xs, ys))),
+                               ax.get_window_extent().extents, ax.figure.dpi, max_labels=max_labels)
+    collection = label_collection(ax.figure, paths, np.column_stack((xs, ys))[kept], ax.transData,
+                                  cls=ProjectedLabelCollection)
+    collection.anchors = anchors[kept]
+    return ax.add_collection(collection, autolim=False)
+
+class ProjectedScene():
+    # Points, segments and cone faces gathered in data coordinates and drawn as
+    # one projected collection each, see projected3D. This skips the
+    # per-artist reprojection mplot3d does on every draw.
+
+    def __init__(self):
+        self.points, self.point_colors = [], []
+        self.segments, self.segment_colors, self.segment_styles = [], [], []
+        self.faces, self.face_colors = [], []
+
+    def add_points(self, xyz, colors):
+        from matplotlib.colors import to_rgba_array
+        self.points.append(np.asarray(xyz, dtype=float).reshape(-1, 3))
+        self.point_colors.append(np.broadcast_to(to_rgba_array(colors), (len(self.points[-1]), 4)))
+
+    def add_segments(self, segments, colors, linestyles):
+        # linestyles is one per segment; a dash tuple is a single style
+        from matplotlib.colors import to_rgba_array
+        self.segments.append(np.asarray(segments, dtype=float).reshape(-1, 2, 3))
+        self.segment_colors.append(np.broadcast_to(to_rgba_array(colors), (len(self.segments[-1]), 4)))
+        self.segment_styles.extend(linestyles)
+
+    def add_faces(self, faces, colors):
+        from matplotlib.colors import to_rgba_array
+        self.faces.append(np.asarray(faces, dtype=float).reshape(-1, 3, 3))
+        self.face_colors.append(np.broadcast_to(to_rgba_array(colors), (len(self.faces[-1]), 4)))
+
+    def draw(self, ax, depthshade=True):
+        # returns the number of collections added; they project themselves
+        # whenever the axes are drawn
+        from projected3D import ProjectedLineCollection, ProjectedPointCollection, ProjectedPolyCollection
+
+        collections = []
+        if self.segments:
+            collections.append(ProjectedLineCollection(np.concatenate(self.segments),
+                                                       np.concatenate(self.segment_colors), self.segment_styles))
+        if self.faces:
+            collections.append(ProjectedPolyCollection(np.concatenate(self.faces), np.concatenate(self.face_colors)))
+        if self.points:
+            collections.append(ProjectedPointCollection(np.concatenate(self.points), np.concatenate(self.point_colors),
+                                                        depthshade=depthshade, offset_transform=ax.transData))
+        for collection in collections:
+            ax.add_collection(collection, autolim=False)
+        return len(collections)
+
+def bounds_3D(objects):
+    # running min/max over every coordinate, always including the origin
+    lower, upper = np.zeros(3), np.zeros(3)
+    for obj in objects:
+        if type(obj) == Points3D:
+            if len(obj):
+                obj_lower = (obj.x.min(), obj.y.min(), obj.z.min())
+                obj_upper = (obj.x.max(), obj.y.max(), obj.z.max())
+            else:
+                continue
+        elif type(obj) == PointStream3D:
+            obj_lower, obj_upper = obj.bounds()
+        else:
+            vectors = np.array(list(extract_vectors_3D([obj])), dtype=float)
+            obj_lower, obj_upper = vectors.min(axis=0), vectors.max(axis=0)
+        np.minimum(lower, obj_lower, out=lower)
+        np.maximum(upper, obj_upper, out=upper)
+    return lower.tolist(), upper.tolist()
+
+def voxel_keys(coords, limits, cells):
+    lower = np.array([lo for lo, _ in limits])
+    size = np.array([hi - lo for lo, hi in limits])
+    voxels = np.clip(((coords - lower) / size * cells).astype(np.intp), 0, cells - 1)
+    return (voxels[:, 0] * cells + voxels[:, 1]) * cells + voxels[:, 2]
+
+def decimate(obj, limits, density_threshold):
+    # keep one point per voxel, with about density_threshold voxels in the box
+    cells = max(1, int(round(density_threshold ** (1. / 3))))
+    keys = voxel_keys(np.column_stack((obj.x, obj.y, obj.z)), limits, cells)
+    _, keep = np.unique(keys, return_index=True)
+    return np.sort(keep)
+
+def decimate_stream(obj, limits, density_threshold):
+    # same as decimate, remembering which voxels earlier chunks already filled
+    cells = max(1, int(round(density_threshold ** (1. / 3))))
+    seen = np.empty(0, dtype=np.intp)
+    kept = [np.empty((0, 3))]
+    for chunk in obj.chunks():
+        keys, first = np.unique(voxel_keys(chunk, limits, cells), return_index=True)
+        new = ~np.isin(keys, seen, assume_unique=True)
+        seen = np.union1d(seen, keys[new])
+        kept.append(chunk[np.sort(first[new])])
+    return np.concatenate(kept)
+
 def set_translucent_panes(ax, dark_mode, pane_alpha=0.15):
+    import matplotlib
+
     if dark_mode:
         pane_color = 'white'
         edge_color = 'white'
@@ -126,43 +347,42 @@ def get_label_xyz(start_point, end_point=None):
     yield ly
     yield lz
 
-def draw3D(*objects, origin=False, axes=True, axes_labels=False, ticks=True, tick_labels=True, grid=True, grid_size=(1,1,1), dark_mode=True, width=6, dpi=100, nice_aspect_ratio=True, save_as=None, azim=None, elev=None, depthshade=True):
+def build3D(fig, *objects, origin=False, axes=True, axes_labels=False, ticks=True, tick_labels=True, grid=True, grid_size=(1,1,1), dark_mode=True, width=6, dpi=100, nice_aspect_ratio=True, azim=None, elev=None, depthshade=True, transform=None, density_threshold=1000000, projected=False, max_labels=None, stats=None):
 
-    if dark_mode:
-        plt.style.use('dark_background')
-        axes_color = 'white'
-    else:
-        plt.style.use('default')
-        axes_color = 'black'
+    from matplotlib.ticker import MultipleLocator
 
-    fig = plt.figure(figsize=(width, width), dpi=dpi)
+    stats, owned = recorder(stats, '3D')
+
+    if transform is not None:
+        with stats.stage('transform'):
+            objects = tuple(transform_objects_3D(transform, objects))
+
+    axes_color = 'white' if dark_mode else 'black'
+
+    fig.set_size_inches(width, width)
+    fig.set_dpi(dpi)
     ax = fig.add_subplot(111, projection='3d')
     
     ax.view_init(elev=elev,azim=azim)
     
-    # Set up grid with custom properties
-    ax.grid(grid)
-    if grid:
-        # Set grid line properties for each axis
-        ax.xaxis._axinfo["grid"]["color"] = (1, 1, 1, 0.2) if dark_mode else (0, 0, 0, 0.2)
-        ax.yaxis._axinfo["grid"]["color"] = (1, 1, 1, 0.2) if dark_mode else (0, 0, 0, 0.2)
-        ax.zaxis._axinfo["grid"]["color"] = (1, 1, 1, 0.2) if dark_mode else (0, 0, 0, 0.2)
-
-    if grid_size:
-        ax.xaxis.set_major_locator(MultipleLocator(grid_size[0]))
-        ax.yaxis.set_major_locator(MultipleLocator(grid_size[1]))
-        ax.zaxis.set_major_locator(MultipleLocator(grid_size[2]))
-    
-    set_translucent_panes(ax, dark_mode=dark_mode)
+    with stats.stage('axes'):
+        # Set up grid with custom properties
+        ax.grid(grid)
+        if grid:
+            # Set grid line properties for each axis
+            ax.xaxis._axinfo["grid"]["color"] = (1, 1, 1, 0.2) if dark_mode else (0, 0, 0, 0.2)
+            ax.yaxis._axinfo["grid"]["color"] = (1, 1, 1, 0.2) if dark_mode else (0, 0, 0, 0.2)
+            ax.zaxis._axinfo["grid"]["color"] = (1, 1, 1, 0.2) if dark_mode else (0, 0, 0, 0.2)
+
+        if grid_size:
+            ax.xaxis.set_major_locator(MultipleLocator(grid_size[0]))
+            ax.yaxis.set_major_locator(MultipleLocator(grid_size[1]))
+            ax.zaxis.set_major_locator(MultipleLocator(grid_size[2]))
+        
+        set_translucent_panes(ax, dark_mode=dark_mode)
     
-    all_vectors = list(extract_vectors_3D(objects))
-    if origin:
-        all_vectors.append((0,0,0))
-    all_x, all_y, all_z = zip(*all_vectors)
-
-    max_x, min_x = max(0,*all_x), min(0,*all_x)
-    max_y, min_y = max(0,*all_y), min(0,*all_y)
-    max_z, min_z = max(0,*all_z), min(0,*all_z)
+    with stats.stage('limits'):
+        (min_x, min_y, min_z), (max_x, max_y, max_z) = bounds_3D(objects)
 
     x_size = max_x-min_x
     y_size = max_y-min_y
@@ -183,9 +403,10 @@ def draw3D(*objects, origin=False, axes=True, axes_labels=False, ticks=True, tic
     auto_ylim = (min_y - pad_y, max_y + pad_y)
     auto_zlim = (min_z - pad_z, max_z + pad_z)
 
-    ax.set_xlim(auto_xlim)
-    ax.set_ylim(auto_ylim)
-    ax.set_zlim(auto_zlim)
+    with stats.stage('limits'):
+        ax.set_xlim(auto_xlim)
+        ax.set_ylim(auto_ylim)
+        ax.set_zlim(auto_zlim)
 
     if axes_labels:
         ax.set_xlabel('x')
@@ -197,83 +418,80 @@ def draw3D(*objects, origin=False, axes=True, axes_labels=False, ticks=True, tic
     z0, z1 = ax.get_zlim()
     
     if axes:
-        draw_segment(ax, (x0, 0, 0), (x1, 0, 0), color=axes_color)
-        draw_segment(ax, (0, y0, 0), (0, y1, 0), color=axes_color)
-        draw_segment(ax, (0, 0, z0), (0, 0, z1), color=axes_color)
+        with stats.stage('axes'):
+            draw_segment(ax, (x0, 0, 0), (x1, 0, 0), color=axes_color)
+            draw_segment(ax, (0, y0, 0), (0, y1, 0), color=axes_color)
+            draw_segment(ax, (0, 0, z0), (0, 0, z1), color=axes_color)
 
     if origin:
         ax.scatter([0],[0],[0], color=axes_color, marker='x', depthshade=depthshade)
 
     # Objects
-    for obj in objects:
-        if type(obj) == Point3D:
-            ax.scatter(obj.x, obj.y, obj.z, color=obj.color, depthshade=depthshade)
-            if obj.label is not None:
-                lx, ly, lz = get_label_xyz((obj.x, obj.y, obj.z))
-                ax.text(lx, ly, lz, obj.label, ha='center')
-        elif type(obj) == Points3D:
-            all_x = [p.x for p in obj.points]
-            all_y = [p.y for p in obj.points]
-            all_z = [p.z for p in obj.points]
-            all_colors = [p.color for p in obj.points]
-            all_labels = [p.label for p in obj.points]
-            ax.scatter(all_x, all_y, all_z, color=all_colors, depthshade=depthshade)
-            for i, txt in enumerate(all_labels):
-                if txt is not None:
-                    lx, ly, lz = get_label_xyz((all_x[i], all_y[i], all_z[i]))
-                    ax.text(lx, ly, lz, all_labels[i], ha='center')
-        elif type(obj) == Line3D:
-            draw_segment(ax, obj.start_point, obj.end_point, color=obj.color, linestyle=obj.linestyle)
-            if obj.label is not None:
-                lx, ly, lz = get_label_xyz(obj.start_point, obj.end_point)
-                ax.text(lx, ly, lz, obj.label, ha='center')
-        elif type(obj) == Arrow3D:
-            head, tail = obj.head, obj.tail
-            length = sqrt((head[0]-tail[0])**2 + (head[1]-tail[1])**2 + (head[2]-tail[2])**2)
-            color, linestyle = obj.color, obj.linestyle
-            head_length, head_radius, head_resolution = obj.head_length, obj.head_radius, obj.head_resolution
-            
-            start = np.asarray(tail, float)
-            d = np.asarray(head, float)
-            n = np.linalg.norm(d)
-            if n == 0:
-                raise ValueError("direction vector must be non-zero")
-            d = d / n
-        
-            shaft_end = start + d * (length - head_length)
-            tip = start + d * length
-        
-            # shaft
-            draw_segment(ax, start, shaft_end, color=color, linestyle=linestyle)
-            if obj.label is not None:
-                lx, ly, lz = get_label_xyz(shaft_end, start)
-                ax.text(lx, ly, lz, obj.label, ha='center')
-        
-            # orthonormal basis around d
-            up = np.array([0., 0., 1.]) if abs(d[2]) < 0.999 else np.array([0., 1., 0.])
-            a = np.cross(d, up); a /= np.linalg.norm(a)
-            b = np.cross(d, a)
-        
-            # cone base ring
-            theta = np.linspace(0, 2*np.pi, head_resolution, endpoint=False)
-            base_center = shaft_end
-            ring = [base_center + head_radius*(np.cos(t)*a + np.sin(t)*b) for t in theta]
-        
-            # triangular faces to tip
-            faces = [[ring[i], ring[(i+1)%head_resolution], tip] for i in range(head_resolution)]
-            ax.add_collection3d(Poly3DCollection(faces, color=color))
+    projected_scene = ProjectedScene() if projected else None
+
+    def scatter(obj, x, y, z, colors):
+        stats.add_points(len(x))
+        if projected_scene is not None:
+            projected_scene.add_points(np.column_stack((x, y, z)), colors)
         else:
-            raise TypeError("Unrecognized object: {}".format(obj))
+            ax.scatter(x, y, z, color=colors, depthshade=depthshade)
+            stats.add_artists(type(obj).__name__)
+
+    arrows = []
+    labels = []
+    with stats.stage('artists'):
+        for obj in objects:
+            if type(obj) == Point3D:
+                scatter(obj, [obj.x], [obj.y], [obj.z], obj.color)
+                if obj.label is not None:
+                    labels.append((obj.label, tuple(get_label_xyz((obj.x, obj.y, obj.z)))))
+            elif type(obj) == Points3D:
+                colors = obj.colors if obj.colors is not None else obj.color
+                if density_threshold is not None and len(obj) > density_threshold:
+                    keep = decimate(obj, (ax.get_xlim(), ax.get_ylim(), ax.get_zlim()), density_threshold)
+                    if obj.colors is not None:
+                        colors = [colors[i] for i in keep]
+                    scatter(obj, obj.x[keep], obj.y[keep], obj.z[keep], colors)
+                else:
+                    scatter(obj, obj.x, obj.y, obj.z, colors)
+                for i, txt in obj.labels.items():
+                    labels.append((txt, tuple(get_label_xyz((obj.x[i], obj.y[i], obj.z[i])))))
+            elif type(obj) == PointStream3D:
+                if density_threshold is not None and len(obj) > density_threshold:
+                    xyz = decimate_stream(obj, (ax.get_xlim(), ax.get_ylim(), ax.get_zlim()), density_threshold)
+                else:
+                    xyz = obj.gather(density_threshold)
+                scatter(obj, xyz[:, 0], xyz[:, 1], xyz[:, 2], obj.color)
+            elif type(obj) == Line3D:
+                stats.add_segments(1)
+                if projected_scene is not None:
+                    projected_scene.add_segments([(obj.start_point, obj.end_point)], obj.color, [obj.linestyle])
+                else:
+                    draw_segment(ax, obj.start_point, obj.end_point, color=obj.color, linestyle=obj.linestyle)
+                    stats.add_artists('Line3D')
+                if obj.label is not None:
+                    labels.append((obj.label, tuple(get_label_xyz(obj.start_point, obj.end_point))))
+            elif type(obj) == Arrow3D:
+                arrows.append(obj)
+            else:
+                raise TypeError("Unrecognized object: {}".format(obj))
     
-    if not tick_labels:
-        ax.set_xticklabels([])
-        ax.set_yticklabels([])
-        ax.set_zticklabels([])
-    
-    if not ticks:
-        ax.set_xticks([])
-        ax.set_yticks([])
-        ax.set_zticks([])
+        if arrows:
+            draw_arrows(ax, arrows, labels, projected=projected_scene)
+            stats.add_segments(len(arrows))
+            if projected_scene is None:
+                stats.add_artists('Arrow3D', 2)
+
+    with stats.stage('ticks'):
+        if not tick_labels:
+            ax.set_xticklabels([])
+            ax.set_yticklabels([])
+            ax.set_zticklabels([])
+        
+        if not ticks:
+            ax.set_xticks([])
+            ax.set_yticks([])
+            ax.set_zticks([])
 
     # Size
     if nice_aspect_ratio:
@@ -285,10 +503,52 @@ def draw3D(*objects, origin=False, axes=True, axes_labels=False, ticks=True, tic
         scale = width/w
         fig.set_size_inches(width, h * scale, forward=True)
         fig.set_dpi(dpi)
-    
-    if save_as:
-        plt.savefig(save_as, dpi=fig.dpi)
 
-    plt.show()
+    # label placement depends on the final box aspect
+    if projected_scene is not None:
+        with stats.stage('projection'):
+            stats.add_artists('projected', projected_scene.draw(ax, depthshade=depthshade))
+    if labels:
+        with stats.stage('labels'):
+            draw_labels(ax, labels, max_labels=max_labels)
+        stats.add_artists('label')
+
+    if owned:
+        stats.finish()
+    return ax
+
+def draw3D(*objects, width=6, dpi=100, dark_mode=True, save_as=None, stats=None, **options):
+
+    import matplotlib.pyplot as plt
+
+    stats, owned = recorder(stats, '3D')
+
+    plt.style.use(style_name(dark_mode))
+    fig = plt.figure(figsize=(width, width), dpi=dpi)
+
+    build3D(fig, *objects, width=width, dpi=dpi, dark_mode=dark_mode, stats=stats, **options)
+
+    if save_as:
+        with stats.stage('savefig'):
+            fig.savefig(save_as, dpi=fig.dpi)
+        if isinstance(save_as, (str, os.PathLike)):
+            stats.set_output(os.path.getsize(save_as))
+
+    with stats.stage('show'):
+        plt.show()
+
+    if owned:
+        stats.finish()
+
+def render3D(*objects, format='png', dark_mode=True, pool=default_pool, stats=None, **options):
+    stats, owned = recorder(stats, '3D')
+    with pool.figure(dark_mode) as fig:
+        build3D(fig, *objects, dark_mode=dark_mode, stats=stats, **options)
+        with stats.stage('output'):
+            data = figure_output(fig, format)
+    stats.set_output(data)
+    if owned:
+        stats.finish()
+    return data
 
 
@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from io import BytesIO
+
+import numpy as np
+
+__all__ = ["FigurePool", "style_name", "figure_output"]
+
+# Figures created here are attached to an Agg canvas directly and never
+# registered with pyplot, so rendering through a pool leaves pyplot's figure
+# manager, current figure and backend untouched. matplotlib itself is only
+# imported once the first figure is made.
+
+def style_name(dark_mode):
+    return 'dark_background' if dark_mode else 'default'
+
+class FigurePool():
+    def __init__(self, size=4):
+        self.size = size
+        self.free = []
+
+    def acquire(self):
+        import matplotlib
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = self.free.pop() if self.free else Figure()
+        FigureCanvasAgg(fig)
+        # pick up the active style, which may differ from the last user's
+        fig.set_facecolor(matplotlib.rcParams['figure.facecolor'])
+        fig.set_edgecolor(matplotlib.rcParams['figure.edgecolor'])
+        return fig
+
+    def release(self, fig):
+        fig.clear()
+        if len(self.free) < self.size:
+            self.free.append(fig)
+
+    @contextmanager
+    def figure(self, dark_mode=True):
+        from matplotlib import style
+
+        with style.context(style_name(dark_mode)):
+            fig = self.acquire()
+            try:
+                yield fig
+            finally:
+                self.release(fig)
+
+default_pool = FigurePool()
+
+def figure_output(fig, format='png'):
+    if format == 'rgba':
+        fig.canvas.draw()
+        return np.asarray(fig.canvas.buffer_rgba()).copy()
+    buffer = BytesIO()
+    fig.savefig(buffer, format=format, dpi=fig.dpi)
+    return buffer.getvalue()
@@ -0,0 +1,125 @@
+from functools import lru_cache
+
+import numpy as np
+
+__all__ = ["place_labels", "label_collection"]
+
+# Label placement for draw2D/draw3D. Every label gets a few candidate boxes
+# around its anchor, all computed at once in points on screen; a grid of the
+# cells already covered by placed labels decides which candidate is free, and
+# labels with no free candidate are dropped. The survivors are drawn as glyph outlines in a
+# single collection instead of one text artist each. matplotlib is imported
+# by the functions that measure and outline text, not with this module.
+
+@lru_cache(maxsize=None)
+def char_metrics(char, size, family):
+    # advance width, ascent and descent of one character in points
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import text_to_path
+
+    width, height, descent = text_to_path.get_text_width_height_descent(
+        char, FontProperties(family=list(family), size=size), ismath=False)
+    return width, height - descent, descent
+
+@lru_cache(maxsize=1024)
+def math_metrics(txt, size, family):
+    # mathtext is laid out as a whole, so it is measured as a whole; keyed by
+    # arbitrary label text, so bounded to keep long batch runs from growing
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import text_to_path
+
+    width, height, descent = text_to_path.get_text_width_height_descent(
+        txt, FontProperties(family=list(family), size=size), ismath=True)
+    return width, height - descent, descent
+
+def text_metrics(txt, size, family):
+    # width, ascent and descent of the text in points; plain text sums the
+    # advances of its characters, which skips kerning but is close enough to
+    # decide collisions
+    from matplotlib.cbook import is_math_text
+
+    if is_math_text(txt):
+        return math_metrics(txt, size, family)
+    metrics = [char_metrics(c, size, family) for c in txt]
+    if not metrics:
+        return 0., 0., 0.
+    return sum(m[0] for m in metrics), max(m[1] for m in metrics), max(m[2] for m in metrics)
+
+def text_box(txt, size, family):
+    # box around the text in points with the anchor at the horizontal center
+    # of the baseline, as for a text artist with ha='center'
+    width, ascent, descent = text_metrics(txt, size, family)
+    return (-width / 2, -descent, width / 2, ascent)
+
+def glyphs(txt, size, family, shift):
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import TextPath
+    from matplotlib.transforms import Affine2D
+
+    path = TextPath((0, 0), txt, size=size, prop=FontProperties(family=list(family)))
+    width = text_metrics(txt, size, family)[0]
+    return path.transformed(Affine2D().translate(shift[0] - width / 2, shift[1]))
+
+def place_labels(texts, anchors, bounds, dpi, max_labels=None, fontsize=None, padding=2):
+    # anchors and bounds are in display pixels; returns the indices of the
+    # labels kept and their outlines, already moved to the chosen candidate.
+    # Outlines are only built for the labels that survive.
+    import matplotlib
+
+    size = fontsize or matplotlib.rcParams['font.size']
+    family = tuple(matplotlib.rcParams['font.family'])
+    texts = [str(txt) for txt in texts]
+    if not texts:
+        return [], []
+    boxes = np.array([text_box(txt, size, family) for txt in texts], dtype=float)
+
+    # in points from here on
+    anchors = np.asarray(anchors, dtype=float).reshape(-1, 2) * 72. / dpi
+    x0, y0, x1, y1 = np.asarray(bounds, dtype=float) * 72. / dpi
+    half = (boxes[:, 2:] - boxes[:, :2]) / 2 + padding / 2.
+    centers = anchors + (boxes[:, :2] + boxes[:, 2:]) / 2
+
+    # as placed, then above, below, right and left of that
+    w, h = 2 * half[:, 0], 2 * half[:, 1]
+    zero = np.zeros(len(w))
+    shifts = np.stack((np.stack((zero, zero), -1), np.stack((zero, h), -1), np.stack((zero, -h), -1),
+                       np.stack((w, zero), -1), np.stack((-w, zero), -1)), axis=1)
+    candidates = centers[:, None, :] + shifts
+    inside = ((candidates[..., 0] >= x0) & (candidates[..., 0] <= x1)
+              & (candidates[..., 1] >= y0) & (candidates[..., 1] <= y1))
+    # labels whose anchor is off the axes are culled outright
+    visible = np.isfinite(anchors).all(axis=1) & (anchors[:, 0] >= x0) & (anchors[:, 0] <= x1) \
+        & (anchors[:, 1] >= y0) & (anchors[:, 1] <= y1)
+
+    # occupancy raster at one cell per point; a box is free when none of
+    # the cells it covers is taken yet
+    lower = np.floor(candidates - half[:, None, :] - (x0, y0)).astype(np.intp)
+    upper = np.ceil(candidates + half[:, None, :] - (x0, y0)).astype(np.intp)
+    lower, upper = np.maximum(lower, 0).tolist(), np.maximum(upper, 0).tolist()
+    taken = np.zeros((int(np.ceil(y1 - y0)) + 1, int(np.ceil(x1 - x0)) + 1), dtype=bool)
+    kept, chosen = [], []
+    for i in np.nonzero(visible)[0].tolist():
+        if max_labels is not None and len(kept) >= max_labels:
+            break
+        for k in np.nonzero(inside[i])[0].tolist():
+            (c0, r0), (c1, r1) = lower[i][k], upper[i][k]
+            if taken[r0:r1, c0:c1].any():
+                continue
+            taken[r0:r1, c0:c1] = True
+            kept.append(i)
+            chosen.append(shifts[i, k])
+            break
+    return kept, [glyphs(texts[i], size, family, shift) for i, shift in zip(kept, chosen)]
+
+def label_collection(fig, paths, offsets, offset_transform, cls=None):
+    # outlines are in points, offsets in whatever offset_transform expects;
+    # cls defaults to PathCollection
+    import matplotlib
+    from matplotlib.collections import PathCollection
+    from matplotlib.transforms import Affine2D
+
+    cls = cls or PathCollection
+    color = matplotlib.rcParams['text.color']
+    return cls(paths, offsets=offsets, offset_transform=offset_transform,
+               transform=Affine2D().scale(1 / 72.) + fig.dpi_scale_trans,
+               facecolors=color, edgecolors='none', linewidths=0, zorder=3)
@@ -0,0 +1,25 @@
+import importlib
+
+__all__ = ["lazy_attributes"]
+
+# Heavy imports (matplotlib, pyplot, mplot3d) are done inside the functions
+# that draw, so importing draw2D or draw3D for the object classes alone stays
+# cheap. What this adds is a module __getattr__ (PEP 562) for names other code
+# reads off the module, as in `from draw2D import plt`: each lookup imports
+# the target and returns it, without writing it into the module, so nothing
+# depends on something having been loaded first.
+#
+#   __getattr__ = lazy_attributes(__name__, {
+#       'plt': 'matplotlib.pyplot',
+#       'LineCollection': 'matplotlib.collections:LineCollection',
+#   })
+
+def lazy_attributes(module_name, imports):
+    # imports maps a name to 'module' or 'module:attribute'
+    def __getattr__(name):
+        if name not in imports:
+            raise AttributeError("module {!r} has no attribute {!r}".format(module_name, name))
+        module, _, attribute = imports[name].partition(':')
+        value = importlib.import_module(module)
+        return getattr(value, attribute) if attribute else value
+    return __getattr__
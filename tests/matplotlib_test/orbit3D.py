@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+
+from matplotlib.animation import FFMpegWriter, PillowWriter
+
+from draw3D import build3D
+from figure_pool import default_pool, figure_output
+
+__all__ = ["orbit3D", "orbit_views"]
+
+# Renders one 3D scene from many camera angles. The figure, panes, axis
+# segments and arrow cones are built once; each view only moves the camera.
+
+def orbit_views(frames=36, elev=30, start_azim=-60):
+    return [(azim, elev) for azim in np.linspace(start_azim, start_azim + 360, frames, endpoint=False)]
+
+def orbit3D(*objects, views=None, save_as=None, frame_dir=None, format='png', fps=20, dark_mode=True, pool=default_pool, **options):
+    views = orbit_views() if views is None else views
+
+    with pool.figure(dark_mode) as fig:
+        ax = build3D(fig, *objects, dark_mode=dark_mode, **options)
+
+        if save_as is not None:
+            writer = PillowWriter(fps=fps) if save_as.endswith('.gif') else FFMpegWriter(fps=fps)
+            with writer.saving(fig, save_as, fig.dpi):
+                for azim, elev in views:
+                    ax.view_init(elev=elev, azim=azim)
+                    writer.grab_frame()
+            return save_as
+
+        if frame_dir is not None:
+            os.makedirs(frame_dir, exist_ok=True)
+            paths = []
+            for i, (azim, elev) in enumerate(views):
+                ax.view_init(elev=elev, azim=azim)
+                paths.append(os.path.join(frame_dir, 'view_{:05d}.{}'.format(i, format)))
+                fig.savefig(paths[-1], dpi=fig.dpi)
+            return paths
+
+        frames = []
+        for azim, elev in views:
+            ax.view_init(elev=elev, azim=azim)
+            frames.append(figure_output(fig, format))
+        return frames
@@ -0,0 +1,88 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+import numpy as np
+
+__all__ = ["pairwise_distance", "pairwise_dot", "pairwise_angle"]
+
+# All-pairs matrices between two vector sets (N, d) and (M, d), computed in row
+# blocks so the temporaries never exceed memory_budget bytes. out may be an
+# existing (N, M) array, or a path to a .npy file that is created memory-mapped.
+# With processes, that many blocks are in flight at once and each is written
+# out as soon as it finishes, so they share the budget between them.
+
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+
+def compute_block(kind, a, b):
+    # each kind works in place on its largest temporary, so a block holds at
+    # most the floats block_rows budgets for it
+    if kind == 'distance':
+        squares = a[:, None, :] - b[None, :, :]
+        np.square(squares, out=squares)
+        distances = squares.sum(axis=-1)
+        del squares
+        return np.sqrt(distances, out=distances)
+    products = a @ b.T
+    if kind == 'dot':
+        return products
+    if kind == 'angle':
+        np.divide(products, np.linalg.norm(a, axis=1)[:, None], out=products)
+        np.divide(products, np.linalg.norm(b, axis=1)[None, :], out=products)
+        # clamp so rounding on (anti)parallel vectors never yields NaN
+        np.clip(products, -1., 1., out=products)
+        return np.arccos(products, out=products)
+    raise ValueError("Unrecognized pairwise kind: {}".format(kind))
+
+def block_rows(kind, n_rows, n_cols, dim, memory_budget):
+    # per row: the output row plus, for distances, the (M, d) difference array;
+    # dot and angle only hold the output, the second float leaves room for the
+    # norm vectors and the matmul's own scratch
+    floats_per_row = n_cols * (dim + 1 if kind == 'distance' else 2)
+    return int(min(n_rows, max(1, memory_budget // (8 * floats_per_row))))
+
+def pairwise(kind, a, b=None, out=None, memory_budget=DEFAULT_MEMORY_BUDGET, processes=None):
+    a = np.atleast_2d(np.asarray(a, dtype=float))
+    b = a if b is None else np.atleast_2d(np.asarray(b, dtype=float))
+    shape = (len(a), len(b))
+
+    if out is None:
+        out = np.empty(shape)
+    elif isinstance(out, str):
+        out = np.lib.format.open_memmap(out, mode='w+', dtype=float, shape=shape)
+    elif out.shape != shape:
+        raise ValueError("out has shape {}, expected {}".format(out.shape, shape))
+
+    step = block_rows(kind, *shape, a.shape[1], memory_budget // processes if processes else memory_budget)
+    starts = iter(range(0, shape[0], step))
+
+    if processes:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            pending = {}
+
+            def submit(n):
+                for i in islice(starts, n):
+                    pending[pool.submit(compute_block, kind, a[i:i + step], b)] = i
+
+            submit(processes)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    out[i:i + step] = future.result()
+                submit(processes - len(pending))
+    else:
+        for i in starts:
+            out[i:i + step] = compute_block(kind, a[i:i + step], b)
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+def pairwise_distance(a, b=None, out=None, memory_budget=DEFAULT_MEMORY_BUDGET, processes=None):
+    return pairwise('distance', a, b, out=out, memory_budget=memory_budget, processes=processes)
+
+def pairwise_dot(a, b=None, out=None, memory_budget=DEFAULT_MEMORY_BUDGET, processes=None):
+    return pairwise('dot', a, b, out=out, memory_budget=memory_budget, processes=processes)
+
+def pairwise_angle(a, b=None, out=None, memory_budget=DEFAULT_MEMORY_BUDGET, processes=None):
+    return pairwise('angle', a, b, out=out, memory_budget=memory_budget, processes=processes)
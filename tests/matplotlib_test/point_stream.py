@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+
+__all__ = ["PointStream2D", "PointStream3D"]
+
+# Points that are read chunk by chunk instead of held in memory. The source can
+# be an ndarray (including np.memmap), a path to a .npy file, which is opened
+# memory-mapped, a callable returning a fresh iterable of (n, d) chunks, such
+# as a generator function, or a re-iterable like a list of chunks. Drawing
+# reads the source more than once, for bounds and then for the points, so a
+# one-shot iterator such as a generator object is refused rather than kept in
+# memory; pass the function that makes it instead. Streams over the
+# renderer's density_threshold are drawn as a density image (2D) or decimated
+# (3D); only those under it are gathered into one array for a scatter.
+
+class PointStream():
+    dim = None
+
+    def __init__(self, source, color='black', chunk_size=1000000):
+        if isinstance(source, (str, os.PathLike)):
+            source = np.load(source, mmap_mode='r')
+        elif not isinstance(source, np.ndarray) and not callable(source) and iter(source) is source:
+            raise TypeError("PointStream needs a re-iterable or callable source, not a one-shot iterator: {}".format(source))
+        self.source = source
+        self.color = color
+        self.chunk_size = chunk_size
+        self._count = len(source) if isinstance(source, np.ndarray) else None
+
+    def as_chunk(self, chunk):
+        return np.asarray(chunk, dtype=float).reshape(-1, self.dim)
+
+    def chunks(self):
+        if isinstance(self.source, np.ndarray):
+            for i in range(0, len(self.source), self.chunk_size):
+                yield self.as_chunk(self.source[i:i + self.chunk_size])
+        else:
+            count = 0
+            for chunk in self.source() if callable(self.source) else self.source:
+                chunk = self.as_chunk(chunk)
+                count += len(chunk)
+                yield chunk
+            self._count = count
+
+    def gather(self, density_threshold):
+        # all points in one (n, d) array, filled chunk by chunk, for drawing a
+        # stream small enough to scatter; the threshold is what keeps it
+        # small, so without one a stream is never loaded whole
+        if density_threshold is None:
+            raise ValueError("{} needs a density_threshold, otherwise every point would be held in memory".format(type(self).__name__))
+        count = len(self)
+        if count > density_threshold:
+            raise ValueError("{} has {} points, over the density_threshold of {}".format(type(self).__name__, count, density_threshold))
+        points = np.empty((count, self.dim))
+        i = 0
+        for chunk in self.chunks():
+            if i + len(chunk) > count:
+                raise ValueError("{} source yielded more points than on its first pass".format(type(self).__name__))
+            points[i:i + len(chunk)] = chunk
+            i += len(chunk)
+        return points[:i]
+
+    def bounds(self):
+        lower, upper = np.full(self.dim, np.inf), np.full(self.dim, -np.inf)
+        for chunk in self.chunks():
+            if len(chunk):
+                np.minimum(lower, chunk.min(axis=0), out=lower)
+                np.maximum(upper, chunk.max(axis=0), out=upper)
+        return lower, upper
+
+    def transformed(self, transform):
+        return type(self)(lambda: (transform.apply(chunk) for chunk in self.chunks()),
+                          color=self.color, chunk_size=self.chunk_size)
+
+    def __len__(self):
+        if self._count is None:
+            for _ in self.chunks():
+                pass
+        return self._count
+
+class PointStream2D(PointStream):
+    dim = 2
+
+class PointStream3D(PointStream):
+    dim = 3
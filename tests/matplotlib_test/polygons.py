@@ -0,0 +1,61 @@
+from itertools import islice
+
+import numpy as np
+
+# Many polygons are stored in a ragged (CSR) layout: all vertices packed into
+# one (M, 2) array, and offsets of length P + 1 so that polygon p owns
+# vertices[offsets[p]:offsets[p + 1]].
+
+def pack_polygons(polygons):
+    polygons = [np.asarray(p, dtype=float).reshape(-1, 2) for p in polygons]
+    offsets = np.zeros(len(polygons) + 1, dtype=np.intp)
+    np.cumsum([len(p) for p in polygons], out=offsets[1:])
+    vertices = np.concatenate(polygons) if polygons else np.empty((0, 2))
+    return vertices, offsets
+
+def polygon_metrics(vertices, offsets):
+    vertices = np.asarray(vertices, dtype=float)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    counts = np.diff(offsets)
+    n_polygons = len(counts)
+    polygon = np.repeat(np.arange(n_polygons), counts)
+
+    # index of the following vertex, wrapping the last one back to the first
+    following = np.arange(1, len(vertices) + 1)
+    nonempty = counts > 0
+    following[offsets[1:][nonempty] - 1] = offsets[:-1][nonempty]
+
+    x, y = vertices[:, 0], vertices[:, 1]
+    xn, yn = x[following], y[following]
+
+    edges = np.hypot(xn - x, yn - y)
+    perimeters = np.bincount(polygon, weights=edges, minlength=n_polygons)
+
+    cross = x * yn - xn * y
+    areas = 0.5 * np.bincount(polygon, weights=cross, minlength=n_polygons)
+
+    cx = np.bincount(polygon, weights=(x + xn) * cross, minlength=n_polygons)
+    cy = np.bincount(polygon, weights=(y + yn) * cross, minlength=n_polygons)
+    centroids = np.empty((n_polygons, 2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        centroids[:, 0] = cx / (6 * areas)
+        centroids[:, 1] = cy / (6 * areas)
+
+    # degenerate polygons have no area, fall back to the mean of their vertices
+    degenerate = areas == 0
+    if degenerate.any():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_x = np.bincount(polygon, weights=x, minlength=n_polygons) / counts
+            mean_y = np.bincount(polygon, weights=y, minlength=n_polygons) / counts
+        centroids[degenerate, 0] = mean_x[degenerate]
+        centroids[degenerate, 1] = mean_y[degenerate]
+
+    return perimeters, areas, centroids
+
+def iter_polygon_metrics(polygons, chunk_size=10000):
+    polygons = iter(polygons)
+    while True:
+        chunk = list(islice(polygons, chunk_size))
+        if not chunk:
+            return
+        yield polygon_metrics(*pack_polygons(chunk))
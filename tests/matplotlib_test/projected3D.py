@@ -0,0 +1,103 @@
+import numpy as np
+
+from matplotlib.collections import LineCollection, PathCollection, PolyCollection
+from matplotlib.markers import MarkerStyle
+from matplotlib.transforms import IdentityTransform
+from mpl_toolkits.mplot3d import proj3d
+
+__all__ = ["ProjectedLineCollection", "ProjectedPolyCollection", "ProjectedPointCollection", "ProjectedLabelCollection"]
+
+# Plain 2D collections that keep their contents in 3D data coordinates. Axes3D
+# calls do_3d_projection on every draw; each collection then pushes all of its
+# contents through the current view/projection matrix in one pass and sorts
+# them with a single argsort, so they follow view_init and interactive
+# rotation. They subclass matplotlib classes, so they live apart from draw3D,
+# which only imports this module once something is drawn.
+
+def project(xyz, M):
+    # (..., 3) data coordinates to (..., 2) projected ones and their depths
+    xs, ys, zs = proj3d.proj_transform(xyz[..., 0].ravel(), xyz[..., 1].ravel(), xyz[..., 2].ravel(), M)
+    shape = xyz.shape[:-1]
+    return np.stack((xs, ys), axis=-1).reshape(shape + (2,)), np.reshape(zs, shape)
+
+def nearest(zs):
+    # the depth Axes3D orders the collection by
+    return zs.min() if zs.size else np.nan
+
+class ProjectedLineCollection(LineCollection):
+    def __init__(self, segments, colors, linestyles, **kwargs):
+        super().__init__([], **kwargs)
+        self.segments3d = segments
+        self.colors3d = colors
+        self.linestyles3d = linestyles
+
+    def do_3d_projection(self):
+        xy, zs = project(self.segments3d, self.axes.get_proj())
+        order = np.argsort(-zs.mean(axis=1), kind='stable')
+        self.set_segments(xy[order])
+        self.set_color(self.colors3d[order])
+        self.set_linestyle([self.linestyles3d[i] for i in order])
+        return nearest(zs)
+
+class ProjectedPolyCollection(PolyCollection):
+    def __init__(self, faces, colors, **kwargs):
+        super().__init__([], **kwargs)
+        self.faces3d = faces
+        self.colors3d = colors
+
+    def do_3d_projection(self):
+        xy, zs = project(self.faces3d, self.axes.get_proj())
+        order = np.argsort(-zs.mean(axis=1), kind='stable')
+        self.set_verts(xy[order])
+        self.set_facecolor(self.colors3d[order])
+        self.set_edgecolor(self.colors3d[order])
+        return nearest(zs)
+
+class ProjectedPointCollection(PathCollection):
+    # Drawn as one batch per distinct color, far batches first, which lets
+    # Agg stamp a single cached marker for every point in a batch. Depth
+    # shading fades distant points the way mplot3d's depthshade does, in a few
+    # discrete steps so the batches stay few.
+    def __init__(self, points, colors, depthshade=True, **kwargs):
+        marker = MarkerStyle('o')
+        super().__init__([marker.get_path().transformed(marker.get_transform())], sizes=[20],
+                         transform=IdentityTransform(), **kwargs)
+        self.points3d = points
+        self.colors3d = colors
+        self.depthshade = depthshade
+        self.batches = []
+
+    def do_3d_projection(self):
+        xy, zs = project(self.points3d, self.axes.get_proj())
+        order = np.argsort(-zs, kind='stable')
+        xy, zs = xy[order], zs[order]
+        colors = self.colors3d[order]
+        if self.depthshade and len(zs):
+            scale = np.sqrt(np.sum(np.ptp(np.column_stack((xy, zs)), axis=0) ** 2))
+            if scale:
+                shade = np.clip(1 - (zs - zs.min()) / scale, 0.3, 1)
+                colors = colors.copy()
+                colors[:, 3] *= np.round(shade * 16) / 16
+
+        palette, batch = np.unique(colors, axis=0, return_inverse=True)
+        batch = batch.ravel()
+        batch_depth = np.bincount(batch, weights=zs) / np.bincount(batch)
+        self.batches = [(xy[batch == b], palette[b:b + 1]) for b in np.argsort(-batch_depth, kind='stable')]
+        return nearest(zs)
+
+    def draw(self, renderer):
+        for offsets, color in self.batches:
+            self.set_offsets(offsets)
+            self.set_facecolor(color)
+            self.set_edgecolor(color)
+            super().draw(renderer)
+
+class ProjectedLabelCollection(PathCollection):
+    # glyph outlines anchored at 3D points, reprojected on every draw so the
+    # labels follow the view, and always drawn last
+    anchors = np.empty((0, 3))
+
+    def do_3d_projection(self):
+        xs, ys, _ = proj3d.proj_transform(*self.anchors.T, self.axes.get_proj())
+        self.set_offsets(np.column_stack((xs, ys)))
+        return -np.inf
@@ -0,0 +1,236 @@
+import hashlib
+import os
+import types
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+
+from draw2D import render2D
+from draw3D import render3D
+from render_stats import recorder
+
+__all__ = ["RenderCache", "scene_key"]
+
+# Rendered images keyed by a hash of everything that affects the output: the
+# renderer, the output format, every object's attributes and the render
+# options. Entries live in memory and optionally in a directory on disk, each
+# tier evicting its least recently used entries once over its byte budget.
+
+KEY_VERSION = b'2'
+HASH_CHUNK_BYTES = 4 * 2**20
+
+def fingerprint(value, h, seen=None):
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        h.update(type(value).__name__.encode())
+        h.update(repr(value).encode())
+    elif isinstance(value, np.ndarray):
+        h.update(b'ndarray')
+        h.update(value.dtype.str.encode())
+        h.update(repr(value.shape).encode())
+        # a slab of rows at a time, so a memory-mapped array is never read
+        # into memory whole; the bytes hashed are those of tobytes()
+        rows = value.reshape(1, -1) if value.ndim == 0 else value
+        step = max(1, HASH_CHUNK_BYTES // max(1, rows[:1].nbytes))
+        for i in range(0, len(rows), step):
+            h.update(np.ascontiguousarray(rows[i:i + step]).data)
+    elif isinstance(value, (list, tuple)):
+        h.update(b'seq%d' % len(value))
+        for item in value:
+            fingerprint(item, h, seen)
+    elif isinstance(value, dict):
+        h.update(b'dict%d' % len(value))
+        for k in sorted(value, key=repr):
+            fingerprint(k, h, seen)
+            fingerprint(value[k], h, seen)
+    elif isinstance(value, (set, frozenset)):
+        # sorted, since set order follows the per-process string hash seed
+        h.update(b'set%d' % len(value))
+        for item in sorted(value, key=repr):
+            fingerprint(item, h, seen)
+    elif isinstance(value, types.CodeType):
+        # nested functions and comprehensions are code objects in co_consts
+        h.update(b'code')
+        h.update(value.co_code)
+        fingerprint((value.co_consts, value.co_names), h, seen)
+    elif isinstance(value, types.FunctionType):
+        # what the function computes: its code, defaults and closure values,
+        # never its identity, so the same function gets the same key in every
+        # process; seen numbers the functions on the way down so one that
+        # refers to itself through its closure stops at a stable marker
+        seen = {} if seen is None else seen
+        if id(value) in seen:
+            h.update(b'function-ref%d' % seen[id(value)])
+            return
+        seen[id(value)] = len(seen)
+        h.update(b'function')
+        h.update('{}.{}'.format(value.__module__, value.__qualname__).encode())
+        fingerprint((value.__code__, value.__defaults__, value.__kwdefaults__, closure_values(value)), h, seen)
+    elif isinstance(value, types.MethodType):
+        h.update(b'method')
+        fingerprint((value.__func__, value.__self__), h, seen)
+    elif isinstance(value, partial):
+        h.update(b'partial')
+        fingerprint((value.func, value.args, value.keywords), h, seen)
+    elif isinstance(value, types.ModuleType):
+        h.update(b'module')
+        h.update(value.__name__.encode())
+    elif isinstance(value, (np.ufunc, types.BuiltinFunctionType)):
+        # named by their repr; ufuncs have a __dict__ with nothing public in it
+        h.update(repr(value).encode())
+    elif hasattr(value, '__dict__'):
+        # cached derived state (underscore attributes) must not change the key
+        h.update(type(value).__qualname__.encode())
+        fingerprint({k: v for k, v in vars(value).items() if not k.startswith('_')}, h, seen)
+    else:
+        h.update(repr(value).encode())
+
+def closure_values(function):
+    values = []
+    for cell in function.__closure__ or ():
+        try:
+            values.append(cell.cell_contents)
+        except ValueError:
+            # a cell not filled in yet
+            values.append(None)
+    return tuple(values)
+
+def scene_key(kind, objects, format, options):
+    h = hashlib.sha256(KEY_VERSION)
+    fingerprint((kind, format, tuple(objects), options), h)
+    return h.hexdigest()
+
+class RenderCache():
+    renderers = {'2D': render2D, '3D': render3D}
+
+    def __init__(self, max_memory_bytes=64 * 2**20, directory=None, max_disk_bytes=512 * 2**20):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = directory
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.hits = self.disk_hits = self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'memory_entries': len(self.memory),
+            'memory_bytes': self.memory_bytes,
+            'disk_bytes': sum(size for _, size, _ in self.disk_entries()),
+        }
+
+    def render2D(self, *objects, format='png', **options):
+        return self.render('2D', objects, format, options)
+
+    def render3D(self, *objects, format='png', **options):
+        return self.render('3D', objects, format, options)
+
+    def render(self, kind, objects, format, options):
+        if format == 'rgba':
+            raise ValueError("RenderCache stores encoded images, use a format such as 'png' or 'svg'")
+        # stats only observe a render, they don't change it; a hit still
+        # reports, as a record with cache_hit set and only the lookup timed
+        stats, owned = recorder(options.pop('stats', None), kind)
+        with stats.stage('cache'):
+            key = scene_key(kind, objects, format, options)
+            data = self.get(key)
+        if data is None:
+            self.misses += 1
+            data = self.renderers[kind](*objects, format=format, stats=stats, **options)
+            self.put(key, data)
+        else:
+            stats.set_cache_hit()
+            stats.set_output(data)
+        if owned:
+            stats.finish()
+        return data
+
+    def get(self, key):
+        data = self.memory.get(key)
+        if data is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return data
+        path = self.path(key)
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            self.hits += 1
+            self.disk_hits += 1
+            self.remember(key, data)
+            return data
+        return None
+
+    def put(self, key, data):
+        self.remember(key, data)
+        path = self.path(key)
+        if path is not None:
+            tmp = '{}.{}.tmp'.format(path, os.getpid())
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self.evict_disk()
+
+    def remember(self, key, data):
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key))
+        if len(data) > self.max_memory_bytes:
+            return
+        self.memory[key] = data
+        self.memory_bytes += len(data)
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    def path(self, key):
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, key + '.img')
+
+    def disk_entries(self):
+        if self.directory is None:
+            return []
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.img'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict_disk(self):
+        entries = sorted(self.disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def invalidate(self, key):
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key))
+        path = self.path(key)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+    def invalidate2D(self, *objects, format='png', **options):
+        self.invalidate(scene_key('2D', objects, format, options))
+
+    def invalidate3D(self, *objects, format='png', **options):
+        self.invalidate(scene_key('3D', objects, format, options))
+
+    def clear(self):
+        for key in list(self.memory):
+            self.invalidate(key)
+        for _, _, path in self.disk_entries():
+            os.remove(path)
+        self.hits = self.disk_hits = self.misses = 0
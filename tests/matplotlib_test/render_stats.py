@@ -0,0 +1,111 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+__all__ = ["RenderStats"]
+
+# Opt-in instrumentation for draw2D/draw3D and their headless variants. Pass
+# stats=RenderStats() to have one filled in, or stats=callback to get a fresh
+# one handed to callback once the render is done. Stage times are wall-clock
+# seconds and add up when a stage runs more than once, as in animations.
+
+class RenderStats():
+    def __init__(self, kind=None, callback=None):
+        self.kind = kind
+        self.callback = callback
+        self.stages = {}
+        self.artists = defaultdict(int)
+        self.points = 0
+        self.segments = 0
+        self.output_bytes = None
+        self.cache_hit = False
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def add_artists(self, obj_type, count=1):
+        self.artists[obj_type] += count
+
+    def add_points(self, count):
+        self.points += count
+
+    def add_segments(self, count):
+        self.segments += count
+
+    def set_output(self, data):
+        # bytes, an ndarray, or a size already measured
+        if isinstance(data, int):
+            self.output_bytes = data
+        else:
+            self.output_bytes = getattr(data, 'nbytes', None) or len(data)
+
+    def set_cache_hit(self, hit=True):
+        self.cache_hit = hit
+
+    @property
+    def total_seconds(self):
+        return sum(self.stages.values())
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'stages': dict(self.stages),
+            'total_seconds': self.total_seconds,
+            'artists': dict(self.artists),
+            'points': self.points,
+            'segments': self.segments,
+            'output_bytes': self.output_bytes,
+            'cache_hit': self.cache_hit,
+        }
+
+    def finish(self):
+        if self.callback is not None:
+            self.callback(self)
+
+    def __repr__(self):
+        stages = ', '.join('{}={:.4f}s'.format(k, v) for k, v in self.stages.items())
+        return 'RenderStats({}: {}; artists={}, points={}, segments={}, output_bytes={}, cache_hit={})'.format(
+            self.kind, stages, dict(self.artists), self.points, self.segments, self.output_bytes, self.cache_hit)
+
+class NullStats():
+    # stands in when no stats were asked for, so call sites need no checks
+    def stage(self, name):
+        return nullcontext()
+
+    def add_artists(self, obj_type, count=1):
+        pass
+
+    def add_points(self, count):
+        pass
+
+    def add_segments(self, count):
+        pass
+
+    def set_output(self, data):
+        pass
+
+    def set_cache_hit(self, hit=True):
+        pass
+
+    def finish(self):
+        pass
+
+null_stats = NullStats()
+
+def recorder(stats, kind):
+    # returns the stats to record into and whether this caller created it and
+    # so has to finish it
+    if stats is None:
+        return null_stats, False
+    if isinstance(stats, NullStats):
+        return stats, False
+    if isinstance(stats, RenderStats):
+        if stats.kind is None:
+            stats.kind = kind
+        return stats, False
+    return RenderStats(kind, callback=stats), True
@@ -0,0 +1,132 @@
+from collections import defaultdict
+from itertools import product
+from math import floor
+
+import numpy as np
+
+__all__ = ["GridIndex"]
+
+# Uniform grid hash over 2D or 3D points. Points are bucketed by the integer
+# cell they fall into, so proximity queries only look at nearby cells instead
+# of scanning every point. Each point gets an integer id on insert.
+
+class GridIndex():
+    def __init__(self, vectors=(), cell_size=None, dim=None):
+        vectors = np.asarray(vectors, dtype=float)
+        if vectors.size == 0:
+            vectors = vectors.reshape(0, dim or 2)
+        self.dim = dim or vectors.shape[1]
+        self.cell_size = cell_size or self.estimate_cell_size(vectors)
+        self.points = {}
+        self.cells = defaultdict(set)
+        self.next_id = 0
+        for v in vectors.tolist():
+            self.insert(v)
+
+    def estimate_cell_size(self, vectors):
+        # aim for about two points per occupied cell on evenly spread data
+        if len(vectors) < 2:
+            return 1.0
+        extent = vectors.max(axis=0) - vectors.min(axis=0)
+        extent = extent[extent > 0]
+        if len(extent) == 0:
+            return 1.0
+        volume = np.prod(extent)
+        return float((2 * volume / len(vectors)) ** (1. / len(extent)))
+
+    def cell(self, v):
+        return tuple(floor(c / self.cell_size) for c in v)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __getitem__(self, id):
+        return self.points[id]
+
+    def insert(self, v):
+        v = tuple(float(c) for c in v)
+        id = self.next_id
+        self.next_id += 1
+        self.points[id] = v
+        self.cells[self.cell(v)].add(id)
+        return id
+
+    def remove(self, id):
+        v = self.points.pop(id)
+        key = self.cell(v)
+        bucket = self.cells[key]
+        bucket.discard(id)
+        if not bucket:
+            del self.cells[key]
+
+    def candidates_in_cells(self, lo, hi):
+        ids = []
+        ranges = [range(a, b + 1) for a, b in zip(lo, hi)]
+        if np.prod([len(r) for r in ranges]) > len(self.cells):
+            for key, bucket in self.cells.items():
+                if all(a <= k <= b for k, a, b in zip(key, lo, hi)):
+                    ids.extend(bucket)
+        else:
+            for key in product(*ranges):
+                bucket = self.cells.get(key)
+                if bucket:
+                    ids.extend(bucket)
+        return ids
+
+    def coords(self, ids):
+        return np.array([self.points[i] for i in ids], dtype=float).reshape(-1, self.dim)
+
+    def box(self, lower, upper):
+        ids = self.candidates_in_cells(self.cell(lower), self.cell(upper))
+        pts = self.coords(ids)
+        inside = np.all((pts >= lower) & (pts <= upper), axis=1)
+        return [i for i, keep in zip(ids, inside) if keep]
+
+    def radius(self, center, r):
+        center = np.asarray(center, dtype=float)
+        ids = self.candidates_in_cells(self.cell(center - r), self.cell(center + r))
+        d2 = np.sum((self.coords(ids) - center) ** 2, axis=1)
+        return [i for i, keep in zip(ids, d2 <= r * r) if keep]
+
+    def nearest(self, center, k=1):
+        center = np.asarray(center, dtype=float)
+        k = min(k, len(self.points))
+        if k == 0:
+            return []
+        origin = self.cell(center)
+        found_ids, found_d = [], np.empty(0)
+        ring = 0
+        while True:
+            if ring > 0 and (2 * ring + 1) ** self.dim > 4 * len(self.cells):
+                # the search area outgrew the occupied cells, finish with a scan
+                ids = list(self.points)
+                return self.closest(ids, self.coords(ids), center, k)
+            ids = []
+            for offset in product(range(-ring, ring + 1), repeat=self.dim):
+                if max(map(abs, offset)) != ring:
+                    continue
+                bucket = self.cells.get(tuple(o + c for o, c in zip(offset, origin)))
+                if bucket:
+                    ids.extend(bucket)
+            if ids:
+                found_ids.extend(ids)
+                found_d = np.concatenate((found_d, np.linalg.norm(self.coords(ids) - center, axis=1)))
+            # cells beyond this ring are at least ring * cell_size away
+            if len(found_ids) >= k and np.partition(found_d, k - 1)[k - 1] <= ring * self.cell_size:
+                order = np.argsort(found_d, kind='stable')[:k]
+                return [(float(found_d[i]), found_ids[i]) for i in order]
+            ring += 1
+
+    def closest(self, ids, pts, center, k):
+        d = np.linalg.norm(pts - center, axis=1)
+        order = np.argsort(d, kind='stable')[:k]
+        return [(float(d[i]), ids[i]) for i in order]
+
+    def nearest_many(self, centers, k=1):
+        return [self.nearest(c, k) for c in np.asarray(centers, dtype=float)]
+
+    def radius_many(self, centers, r):
+        return [self.radius(c, r) for c in np.asarray(centers, dtype=float)]
+
+    def box_many(self, lowers, uppers):
+        return [self.box(lo, hi) for lo, hi in zip(np.asarray(lowers, float), np.asarray(uppers, float))]
@@ -0,0 +1,39 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from pairwise import pairwise
+
+# The budget covers the temporaries of a block; the output is allocated up
+# front, so it is passed in and left out of the measured peak.
+
+BUDGET = 8 * 2**20
+
+def naive(kind, a, b):
+    products = a @ b.T
+    if kind == 'dot':
+        return products
+    if kind == 'distance':
+        return np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=-1))
+    norms = np.linalg.norm(a, axis=1)[:, None] * np.linalg.norm(b, axis=1)[None, :]
+    return np.arccos(np.clip(products / norms, -1., 1.))
+
+@pytest.mark.parametrize('kind', ['distance', 'dot', 'angle'])
+def test_matches_naive(kind):
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(size=(300, 3)), rng.normal(size=(200, 3))
+    np.testing.assert_allclose(pairwise(kind, a, b, memory_budget=2**16), naive(kind, a, b), atol=1e-12)
+
+@pytest.mark.parametrize('kind', ['distance', 'dot', 'angle'])
+def test_peak_within_budget(kind):
+    rng = np.random.default_rng(0)
+    a, b = rng.normal(size=(4000, 3)), rng.normal(size=(4000, 3))
+    out = np.empty((len(a), len(b)))
+    tracemalloc.start()
+    try:
+        pairwise(kind, a, b, out=out, memory_budget=BUDGET)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak <= BUDGET
@@ -0,0 +1,83 @@
+from math import sin, cos
+
+import numpy as np
+
+__all__ = ["Transform2D", "Transform3D"]
+
+# Transforms are immutable chains of steps, applied in the order they were
+# added. The steps are folded into a single homogeneous matrix the first time
+# it is needed, so a chain costs one matrix product per batch of vectors.
+
+class Transform():
+    dim = None
+
+    def __init__(self, steps=()):
+        self.steps = tuple(steps)
+        self._matrix = None
+
+    def then(self, matrix):
+        return type(self)(self.steps + (matrix,))
+
+    def compose(self, other):
+        return type(self)(self.steps + other.steps)
+
+    def translate(self, translation):
+        m = np.identity(self.dim + 1)
+        m[:self.dim, self.dim] = translation
+        return self.then(m)
+
+    def scale(self, factor):
+        m = np.identity(self.dim + 1)
+        m[:self.dim, :self.dim] *= np.broadcast_to(np.asarray(factor, float), (self.dim,))
+        return self.then(m)
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            m = np.identity(self.dim + 1)
+            for step in self.steps:
+                m = step @ m
+            self._matrix = m
+        return self._matrix
+
+    def apply(self, vectors):
+        arr = np.asarray(vectors, dtype=float)
+        m = self.matrix
+        result = arr @ m[:self.dim, :self.dim].T + m[:self.dim, self.dim]
+        if isinstance(vectors, np.ndarray):
+            return result
+        if arr.ndim == 1:
+            return tuple(result.tolist())
+        return [tuple(v) for v in result.tolist()]
+
+    def __call__(self, vectors):
+        return self.apply(vectors)
+
+class Transform2D(Transform):
+    dim = 2
+
+    def rotate(self, angle):
+        c, s = cos(angle), sin(angle)
+        return self.then(np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]]))
+
+class Transform3D(Transform):
+    dim = 3
+
+    def rotate(self, axis, angle):
+        x, y, z = np.asarray(axis, float) / np.linalg.norm(axis)
+        c, s = cos(angle), sin(angle)
+        t = 1 - c
+        m = np.identity(4)
+        m[:3, :3] = [[t*x*x + c,   t*x*y - s*z, t*x*z + s*y],
+                     [t*x*y + s*z, t*y*y + c,   t*y*z - s*x],
+                     [t*x*z - s*y, t*y*z + s*x, t*z*z + c]]
+        return self.then(m)
+
+    def rotate_x(self, angle):
+        return self.rotate((1, 0, 0), angle)
+
+    def rotate_y(self, angle):
+        return self.rotate((0, 1, 0), angle)
+
+    def rotate_z(self, angle):
+        return self.rotate((0, 0, 1), angle)
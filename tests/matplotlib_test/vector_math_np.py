@@ -0,0 +1,65 @@
+from functools import reduce
+
+import numpy as np
+
+# Array counterparts of vector_math: every function takes a single vector of
+# shape (d,) or a batch of shape (N, d) and broadcasts one against the other.
+
+def as_vectors(v):
+    return np.asarray(v, dtype=float)
+
+def add(*vectors):
+    return reduce(np.add, map(as_vectors, vectors))
+
+def subtract(v1, v2):
+    return as_vectors(v1) - as_vectors(v2)
+
+def length(v):
+    v = as_vectors(v)
+    return np.sqrt(np.einsum('...i,...i->...', v, v))
+
+def dot(v1, v2):
+    v1, v2 = np.broadcast_arrays(as_vectors(v1), as_vectors(v2))
+    return np.einsum('...i,...i->...', v1, v2)
+
+def distance(v1, v2):
+    return length(subtract(v1, v2))
+
+def perimeter(vectors):
+    vectors = as_vectors(vectors)
+    return distance(vectors, np.roll(vectors, -1, axis=0)).sum()
+
+def scale(scalar, v):
+    return np.expand_dims(as_vectors(scalar), -1) * as_vectors(v)
+
+def to_cartesian(polar_vector):
+    polar_vector = as_vectors(polar_vector)
+    length, angle = polar_vector[..., 0], polar_vector[..., 1]
+    return np.stack((length * np.cos(angle), length * np.sin(angle)), axis=-1)
+
+def rotate(angle, vectors):
+    c, s = np.cos(angle), np.sin(angle)
+    return as_vectors(vectors) @ np.array([[c, s], [-s, c]])
+
+def translate(translation, vectors):
+    return add(translation, vectors)
+
+def to_polar(vector):
+    vector = as_vectors(vector)
+    angle = np.arctan2(vector[..., 1], vector[..., 0])
+    return np.stack((length(vector), angle), axis=-1)
+
+def angle_between(v1, v2):
+    # clamp so rounding on (anti)parallel vectors never yields NaN
+    cosine = dot(v1, v2) / (length(v1) * length(v2))
+    return np.arccos(np.clip(cosine, -1., 1.))
+
+def cross(v1, v2):
+    return np.cross(as_vectors(v1), as_vectors(v2))
+
+def component(v, direction):
+    return dot(v, direction) / length(direction)
+
+def unit(v):
+    v = as_vectors(v)
+    return v / length(v)[..., None]
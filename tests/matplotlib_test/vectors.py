@@ -0,0 +1,168 @@
+from math import sqrt
+from numbers import Number
+
+__all__ = ["Vector2", "Vector3"]
+
+# Fixed-size tuples with arithmetic operators. They stay real tuples, so they
+# unpack, index and pass through vector_math, draw2D and draw3D unchanged,
+# while the operators avoid the generic zip/sum loops.
+
+class Vector2(tuple):
+    __slots__ = ()
+
+    def __new__(cls, x=0, y=0):
+        return tuple.__new__(cls, (x, y))
+
+    @property
+    def x(self):
+        return self[0]
+
+    @property
+    def y(self):
+        return self[1]
+
+    def __add__(self, other):
+        x1, y1 = self
+        try:
+            x2, y2 = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        return Vector2(x1 + x2, y1 + y2)
+
+    def __radd__(self, other):
+        # sum() starts from 0
+        if isinstance(other, Number) and other == 0:
+            return self
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        x1, y1 = self
+        try:
+            x2, y2 = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        return Vector2(x1 - x2, y1 - y2)
+
+    def __rsub__(self, other):
+        try:
+            x1, y1 = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        x2, y2 = self
+        return Vector2(x1 - x2, y1 - y2)
+
+    def __mul__(self, scalar):
+        x, y = self
+        return Vector2(scalar * x, scalar * y)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        x, y = self
+        return Vector2(x / scalar, y / scalar)
+
+    def __neg__(self):
+        x, y = self
+        return Vector2(-x, -y)
+
+    def dot(self, other):
+        x1, y1 = self
+        x2, y2 = other
+        return x1 * x2 + y1 * y2
+
+    def cross(self, other):
+        x1, y1 = self
+        x2, y2 = other
+        return x1 * y2 - y1 * x2
+
+    def norm(self):
+        x, y = self
+        return sqrt(x * x + y * y)
+
+    def unit(self):
+        return self / self.norm()
+
+    def __repr__(self):
+        return "Vector2({!r}, {!r})".format(*self)
+
+class Vector3(tuple):
+    __slots__ = ()
+
+    def __new__(cls, x=0, y=0, z=0):
+        return tuple.__new__(cls, (x, y, z))
+
+    @property
+    def x(self):
+        return self[0]
+
+    @property
+    def y(self):
+        return self[1]
+
+    @property
+    def z(self):
+        return self[2]
+
+    def __add__(self, other):
+        x1, y1, z1 = self
+        try:
+            x2, y2, z2 = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        return Vector3(x1 + x2, y1 + y2, z1 + z2)
+
+    def __radd__(self, other):
+        # sum() starts from 0
+        if isinstance(other, Number) and other == 0:
+            return self
+        return self.__add__(other)
+
+    def __sub__(self, other):
+        x1, y1, z1 = self
+        try:
+            x2, y2, z2 = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        return Vector3(x1 - x2, y1 - y2, z1 - z2)
+
+    def __rsub__(self, other):
+        try:
+            x1, y1, z1 = other
+        except (TypeError, ValueError):
+            return NotImplemented
+        x2, y2, z2 = self
+        return Vector3(x1 - x2, y1 - y2, z1 - z2)
+
+    def __mul__(self, scalar):
+        x, y, z = self
+        return Vector3(scalar * x, scalar * y, scalar * z)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        x, y, z = self
+        return Vector3(x / scalar, y / scalar, z / scalar)
+
+    def __neg__(self):
+        x, y, z = self
+        return Vector3(-x, -y, -z)
+
+    def dot(self, other):
+        x1, y1, z1 = self
+        x2, y2, z2 = other
+        return x1 * x2 + y1 * y2 + z1 * z2
+
+    def cross(self, other):
+        x1, y1, z1 = self
+        x2, y2, z2 = other
+        return Vector3(y1 * z2 - z1 * y2, z1 * x2 - x1 * z2, x1 * y2 - y1 * x2)
+
+    def norm(self):
+        x, y, z = self
+        return sqrt(x * x + y * y + z * z)
+
+    def unit(self):
+        return self / self.norm()
+
+    def __repr__(self):
+        return "Vector3({!r}, {!r}, {!r})".format(*self)